@@ -0,0 +1,121 @@
+'''
+补算每日数据：一次读取日期范围内（以及范围开始前最近一天）的全部快照，按 内容ID、快照日期 排序后
+用一次向量化的分组差分算出每一天的增量，结果与逐天运行 get_daily_data 的计算方式相同（与之前最近一个快照做差，
+之前没有的作品按 0 计算，取绝对值）
+
+用法：python -m data_processing.backfill --platform douyin --start 2025-05-01 --end 2025-05-31
+'''
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# 配置模块级路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from project_config.project import platform_column_maps, min_publish_date, BASE_DIR
+from utils.snapshot_store import SnapshotStore
+from utils.content_id import ID_COLUMN, comparable_ids, dedupe_ids
+
+PLATFORM_NAMES = {"douyin": "抖音", "xhs": "小红书"}
+# 参与做差的统一字段（与 DailyDataProcessor.compare_columns 一致）
+COMPARE_FIELDS = ["播放量", "点赞量", "分享量", "评论量", "收藏量"]
+
+
+def platform_columns(platform):
+    mapping = platform_column_maps[platform]
+    return mapping["作品名称"], mapping["发布时间"], [mapping[f] for f in COMPARE_FIELDS]
+
+
+def load_range(platform, start, end, store=None):
+    """
+    读取 [start, end] 内的快照，以及 start 之前最近一天的快照（作为第一天的对比基准）
+    :return: (合并后的 DataFrame，含“快照日期”列；范围内的快照日期列表)
+    """
+    store = store or SnapshotStore()
+    dates = [d for d in store.dates(platform) if start <= d <= end]
+    baseline = store.latest(platform, before=start)
+    frames = []
+    loaded = ([baseline] if baseline else []) + dates
+    for date in loaded:
+        frames.append(store.load(platform, date))
+    if not frames:
+        return pd.DataFrame(), dates
+    comparable_ids(frames, platform)
+    for i, date in enumerate(loaded):
+        # 同一快照中重复的内容ID只保留一行
+        frames[i] = dedupe_ids(frames[i], platform, date)
+        frames[i]["快照日期"] = np.datetime64(date, "ns")
+    return pd.concat(frames, ignore_index=True), dates
+
+
+def daily_deltas(platform, start, end, store=None):
+    """
+    计算 [start, end] 内每个快照日期的每日数据
+    :param start: 起始快照日期（导出当天，YYYY-MM-DD）
+    :param end: 结束快照日期（含）
+    :return: DataFrame，列与 get_daily_data 的结果相同（平台、日期 + 快照中的列），日期为快照日期的前一天
+    """
+    title_col, publish_col, compare_cols = platform_columns(platform)
+    data, dates = load_range(platform, start, end, store)
+    if not dates:
+        print(f"⚠️ {PLATFORM_NAMES[platform]} {start} ~ {end} 没有快照")
+        return pd.DataFrame()
+
+    # 每个快照日期对应的上一个快照日期（全局），与 get_daily_data 一样只和最近一天的快照比较
+    all_dates = pd.DatetimeIndex(np.sort(data["快照日期"].unique()))
+    previous_of = dict(zip(all_dates[1:], all_dates[:-1]))
+
+    data = data.sort_values([ID_COLUMN, "快照日期"], kind="stable").reset_index(drop=True)
+
+    # 同一作品的上一行：内容ID相同、且正好是上一个快照日期时才作为对比值，否则按 0（之前没有该作品）
+    ids = data[ID_COLUMN].to_numpy()
+    same_key = np.r_[False, ids[1:] == ids[:-1]]
+    expected_previous = data["快照日期"].map(previous_of)
+    same_key &= (data["快照日期"].shift() == expected_previous).to_numpy()
+
+    for col in compare_cols:
+        previous = data[col].shift().where(same_key, 0).fillna(0)
+        data[col] = (data[col] - previous).abs()
+
+    in_range = data["快照日期"] >= np.datetime64(start, "ns")
+    published = pd.to_datetime(data[publish_col]) >= datetime.strptime(min_publish_date, "%Y-%m-%d")
+    result = data[in_range & published].sort_values(["快照日期", title_col], kind="stable").reset_index(drop=True)
+
+    labels = (result.pop("快照日期") - timedelta(days=1)).dt.strftime("%Y-%m-%d")
+    result.insert(0, "日期", labels)
+    result.insert(0, "平台", pd.Categorical([PLATFORM_NAMES[platform]] * len(result)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按快照补算一段日期的每日数据")
+    parser.add_argument("--platform", choices=("douyin", "xhs"), required=True)
+    parser.add_argument("--start", required=True, help="起始快照日期 YYYY-MM-DD（导出当天，每日数据的日期为其前一天）")
+    parser.add_argument("--end", default=datetime.now().strftime("%Y-%m-%d"), help="结束快照日期（含），默认今天")
+    parser.add_argument("--output", default=None, help="输出的 xlsx 或 csv 文件，默认 xlsx_file/<平台>_每日数据_<起>_<止>.xlsx")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = daily_deltas(args.platform, args.start, args.end)
+    if result.empty:
+        return
+    output = args.output or str(BASE_DIR / "xlsx_file" / f"{args.platform}_每日数据_{args.start}_{args.end}.xlsx")
+    if output.endswith(".csv"):
+        result.to_csv(output, index=False, encoding="utf-8-sig")
+    else:
+        result.to_excel(output, index=False)
+    days = result["日期"].nunique()
+    print(f"✅ 已补算 {days} 天、{len(result)} 行（{time.perf_counter() - started:.1f} 秒）：{output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+'''
+多窗口增量：把快照历史整理成 作品 × 快照日期 × 指标 的三维矩阵，用 NumPy 一次算出各时间窗口（默认 1/7/30 天）的
+带符号增量（平台修正数据导致的负数会保留，不取绝对值）。周报、月报不必把每日任务重复运行多次
+
+窗口 w 天的增量 = 当天累计值 − w 天前（或之前最近一个）快照中的累计值；当时没有该作品按 0 计算；
+快照历史不足 w 天时为空
+
+用法：python -m data_processing.delta_engine --platform douyin --end 2025-05-31 --windows 1 7 30
+'''
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# 配置模块级路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from project_config.project import min_publish_date, BASE_DIR
+from utils.snapshot_store import SnapshotStore
+from utils.content_id import ID_COLUMN, comparable_ids, dedupe_ids
+from data_processing.backfill import PLATFORM_NAMES, platform_columns
+
+DEFAULT_WINDOWS = (1, 7, 30)
+
+
+def _load_history(platform, start, end, max_window, store):
+    """
+    读取计算 [start, end] 内各窗口所需的全部快照：start − max_window 天起到 end，再加上更早最近的一个
+    :return: (合并后的 DataFrame，含“快照日期”列；范围内的快照日期列表)
+    """
+    first = (datetime.strptime(start, "%Y-%m-%d") - timedelta(days=max_window)).strftime("%Y-%m-%d")
+    dates = [d for d in store.dates(platform) if first <= d <= end]
+    baseline = store.latest(platform, before=first)
+    loaded = ([baseline] if baseline else []) + dates
+    frames = [store.load(platform, d) for d in loaded]
+    if not frames:
+        return pd.DataFrame(), []
+    comparable_ids(frames, platform)
+    for i, date in enumerate(loaded):
+        frames[i] = dedupe_ids(frames[i], platform, date)
+        frames[i]["快照日期"] = np.datetime64(date, "ns")
+    return pd.concat(frames, ignore_index=True), [d for d in dates if d >= start]
+
+
+def window_deltas(platform, end=None, start=None, windows=DEFAULT_WINDOWS, store=None):
+    """
+    :param end: 最后一个快照日期（YYYY-MM-DD），None 为最近一次
+    :param start: 第一个快照日期，None 时与 end 相同（只算一天）
+    :param windows: 窗口天数
+    :return: 每个 快照日期 × 作品 一行：平台、日期（快照日期前一天）、作品信息、各指标的累计值（<指标>_累计）
+             和各窗口的增量（<指标>_<w>d）
+    """
+    store = store or SnapshotStore()
+    end = end or store.latest(platform)
+    start = start or end
+    if end is None:
+        print(f"⚠️ 快照库中没有{PLATFORM_NAMES[platform]}的数据")
+        return pd.DataFrame()
+    title_col, publish_col, metrics = platform_columns(platform)
+    data, target_dates = _load_history(platform, start, end, max(windows), store)
+    if not target_dates:
+        print(f"⚠️ {PLATFORM_NAMES[platform]} {start} ~ {end} 没有快照")
+        return pd.DataFrame()
+
+    # 作品 × 快照日期 × 指标 矩阵；present 记录作品在该快照中是否出现
+    snap_dates = np.sort(data["快照日期"].unique())
+    id_codes, ids = pd.factorize(data[ID_COLUMN])
+    date_codes = np.searchsorted(snap_dates, data["快照日期"].to_numpy())
+    values = np.full((len(ids), len(snap_dates), len(metrics)), np.nan)
+    values[id_codes, date_codes] = data[metrics].astype("float64").to_numpy(na_value=np.nan)
+    present = np.zeros((len(ids), len(snap_dates)), dtype=bool)
+    present[id_codes, date_codes] = True
+
+    rows = (data["快照日期"] >= np.datetime64(start, "ns")).to_numpy()
+    result = data[rows].copy()
+    row_ids, row_dates = id_codes[rows], date_codes[rows]
+    for metric in metrics:
+        result.rename(columns={metric: f"{metric}_累计"}, inplace=True)
+
+    for w in windows:
+        # 每个快照日期往前 w 天（含）最近的快照，-1 表示历史不足
+        lag = np.searchsorted(snap_dates, snap_dates - np.timedelta64(w, "D"), side="right") - 1
+        lag_safe = np.maximum(lag, 0)
+        previous = np.where(present[:, lag_safe, None], np.nan_to_num(values[:, lag_safe]), 0.0)
+        deltas = values - previous
+        deltas[:, lag < 0] = np.nan
+        picked = deltas[row_ids, row_dates]
+        for i, metric in enumerate(metrics):
+            result[f"{metric}_{w}d"] = picked[:, i]
+
+    published = pd.to_datetime(result[publish_col]) >= datetime.strptime(min_publish_date, "%Y-%m-%d")
+    result = result[published].sort_values(["快照日期", title_col], kind="stable").reset_index(drop=True)
+    labels = (result.pop("快照日期") - timedelta(days=1)).dt.strftime("%Y-%m-%d")
+    result.insert(0, "日期", labels)
+    result.insert(0, "平台", pd.Categorical([PLATFORM_NAMES[platform]] * len(result)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按快照计算多个时间窗口的增量")
+    parser.add_argument("--platform", choices=("douyin", "xhs"), required=True)
+    parser.add_argument("--end", default=None, help="最后一个快照日期 YYYY-MM-DD，默认最近一次")
+    parser.add_argument("--start", default=None, help="第一个快照日期，默认与 --end 相同")
+    parser.add_argument("--windows", type=int, nargs="+", default=list(DEFAULT_WINDOWS), help="窗口天数，默认 1 7 30")
+    parser.add_argument("--output", default=None, help="输出的 xlsx 或 csv 文件，默认 xlsx_file/<平台>_多窗口增量_<日期>.xlsx")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = window_deltas(args.platform, end=args.end, start=args.start, windows=args.windows)
+    if result.empty:
+        return
+    output = args.output or str(BASE_DIR / "xlsx_file" / f"{args.platform}_多窗口增量_{result['日期'].iloc[-1]}.xlsx")
+    if output.endswith(".csv"):
+        result.to_csv(output, index=False, encoding="utf-8-sig")
+    else:
+        result.to_excel(output, index=False)
+    print(f"✅ 已计算 {len(result)} 行、窗口 {args.windows}（{time.perf_counter() - started:.1f} 秒）：{output}")
+
+
+if __name__ == "__main__":
+    main()
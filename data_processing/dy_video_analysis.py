@@ -1,5 +1,5 @@
 '''
-处理下载的抖音视频质量数据，将其转换为当天的数据，并在处理后将其重命名，为下一天继续处理做准备
+处理下载的抖音视频质量数据：从快照库中取当天和之前最近一天的累计数据做差，转换为当天的数据
 '''
 
 import pandas as pd
@@ -19,84 +19,110 @@ class DailyDataProcessor:
         if project_root not in sys.path:
             sys.path.append(project_root)
 
-        from project_config.project import dy_data_path, dy_yesterday_path, dy_file_path
+        from project_config.project import (
+            dy_data_path, dy_yesterday_path, dy_file_path, min_publish_date
+        )
+        from utils.snapshot_store import SnapshotStore
 
         self.dy_data_path = dy_data_path
         self.dy_yesterday_path = dy_yesterday_path
         self.dy_file_path = dy_file_path
+        self.snapshots = SnapshotStore()
+        # 早于该日期发布的作品不参与计算（与导出范围的起点一致）
+        self.min_date = datetime.strptime(min_publish_date, '%Y-%m-%d')
         self.compare_columns = ['播放量', '点赞量', '分享量', '评论量', '收藏量']
 
-    def get_daily_data(self):
-        # 读取当天数据和昨天的数据
-        data_df = pd.read_excel(self.dy_data_path)
-        yesterday_df = pd.read_excel(self.dy_yesterday_path)
+    def _import_legacy(self):
+        """
+        一次性迁移：快照库中还没有该平台的数据时，把旧版本留下的昨日数据存入快照库作为第一天的对比基准
+        （日期取文件修改日期，文件本身不删除）。当前的合并结果不导入：它的修改日期不一定是数据的日期，
+        之后每次合并都会自动存入当天的快照
+        """
+        if self.snapshots.dates("douyin"):
+            return
+        for path in (
+            self.dy_yesterday_path,
+            os.path.join(self.dy_file_path, "yesterday_data.xlsx"),
+        ):
+            self.snapshots.import_file("douyin", path)
+
+    def get_daily_data(self, date=None):
+        """
+        某一天的快照减去之前最近一个快照，得到每日数据
+        :param date: 快照日期（导出当天，YYYY-MM-DD），None 为最近一次；结果中的“日期”为快照日期的前一天
+        """
+        self._import_legacy()
+        date = date or self.snapshots.latest("douyin")
+        if date is None or not self.snapshots.has("douyin", date):
+            raise FileNotFoundError(f"快照库中没有抖音 {date or ''} 的数据，请先运行导出")
+        previous = self.snapshots.latest("douyin", before=date)
+
+        # 读取当天数据和之前最近一天的数据
+        data_df = self.snapshots.load("douyin", date)
+        if previous is None:
+            print(f"⚠️ 抖音没有 {date} 之前的快照，每日数据按累计值计算")
+            yesterday_df = data_df.iloc[0:0]
+        else:
+            yesterday_df = self.snapshots.load("douyin", previous)
 
         # 确认发布时间字段格式为日期格式
         data_df['发布时间'] = pd.to_datetime(data_df['发布时间'])
         yesterday_df['发布时间'] = pd.to_datetime(yesterday_df['发布时间'])
 
         # 日期过滤条件
-        min_date = datetime(2025, 3, 4)
+        min_date = self.min_date
 
-        # 筛选出符合条件的数据（开始日期≥2025-03-04）
+        # 筛选出符合条件的数据（发布时间 ≥ min_publish_date）
         filtered_data_df = data_df[data_df['发布时间'] >= min_date].copy()
 
-        # 使用明确的字段（比如：作品名称）合并今天和昨天的数据
-        daily_data = pd.merge(
-            filtered_data_df,
-            yesterday_df[['作品名称'] + self.compare_columns],
-            on='作品名称',
-            how='left',
-            suffixes=('', '_昨日')
-        )
-
-        # 处理昨日无数据的情况
-        for col in self.compare_columns:
-            yesterday_col = f"{col}_昨日"
-            daily_data[yesterday_col] = daily_data[yesterday_col].fillna(0)
+        # 按内容ID（64 位整数，见 utils.content_id）对齐今天和之前最近一天的数据，不再按标题合并；
+        # 重复的内容ID会被报告并只保留一行，避免行数成倍增加
+        from utils.content_id import comparable_ids, dedupe_ids, align_previous
+        filtered_data_df, yesterday_df = comparable_ids([filtered_data_df, yesterday_df], "douyin")
+        daily_data = dedupe_ids(filtered_data_df, "douyin", date).reset_index(drop=True)
+        previous_values = align_previous(daily_data, dedupe_ids(yesterday_df, "douyin", previous), self.compare_columns)
 
-            # 计算绝对值差值
-            daily_data[col] = (daily_data[col] - daily_data[yesterday_col]).abs()
-
-            # 删除昨日数据列，保留最终计算结果
-            daily_data.drop(columns=[yesterday_col], inplace=True)
+        # 之前没有的作品按 0 计算（全部指标一次相减）
+        cols = self.compare_columns
+        daily_data[cols] = (daily_data[cols] - previous_values[cols].fillna(0)).abs()
 
         # 筛选发布时间满足条件的数据
         daily_data = daily_data[daily_data['发布时间'] >= min_date].reset_index(drop=True)     
         
         # 获取昨天日期，格式为YYYY-MM-DD
-        yesterday_str = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        yesterday_str = (datetime.strptime(date, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
         
         # 在daily_data第一列插入日期字段
         daily_data.insert(0, '日期', yesterday_str)
 
         # 在daily_data第一列插入平台字段
-        daily_data.insert(0, '平台', '抖音')
+        daily_data.insert(0, '平台', pd.Categorical(['抖音'] * len(daily_data)))
         
         # 返回处理后的daily_data
         return daily_data
     
+    def get_window_data(self, date=None, windows=(1, 7, 30)):
+        """
+        多个时间窗口的带符号增量（不取绝对值），见 data_processing.delta_engine
+        :param date: 快照日期，None 为最近一次
+        """
+        self._import_legacy()
+        from data_processing.delta_engine import window_deltas
+        return window_deltas("douyin", end=date, windows=windows, store=self.snapshots)
+
     def update_yesterday_data(self):
         """
-        删除dy_yesterday_path文件，并将dy_data_path重命名为yesterday_data.xlsx
-        :param dy_file_path: 存放yesterday_data.xlsx的目标目录
+        快照库按日期保存每天的数据，不再删除、改名昨日数据文件；这里只在快照库为空时导入旧版本的昨日数据（重复调用结果相同）
         """
-        # 确保 dy_yesterday_path 文件存在再删除
-        if os.path.exists(self.dy_yesterday_path):
-            os.remove(self.dy_yesterday_path)
-            print(f"✅ 已删除旧的昨日数据文件: {self.dy_yesterday_path}")
-        else:
-            print("⚠️ 旧的昨日数据文件不存在，无需删除。")
-        
-        # 目标文件路径
-        new_yesterday_path = os.path.join(self.dy_file_path, "yesterday_data.xlsx")
-        
-        # 重命名 dy_data_path 文件
-        if os.path.exists(self.dy_data_path):
-            os.rename(self.dy_data_path, new_yesterday_path)
-            print(f"✅ 已将 {self.dy_data_path} 重命名为 {new_yesterday_path}")
-        else:
-            print("❌ 无法重命名，dy_data_path 文件不存在。")
+        self._import_legacy()
+        print(f"✅ 快照库已有的日期：{', '.join(self.snapshots.dates('douyin')[-3:])}")
+
+    def convert_to_video_quality_format(self, date=None):
+        """
+        获取 daily_data，并将其转换为 视频质量数据 模板格式（与小红书相同的统一字段，见 data_processing.fact_table）
+        """
+        from data_processing.fact_table import to_fact
+        return to_fact(self.get_daily_data(date), "douyin", with_keys=False)
 
 # 示例调用
 if __name__ == "__main__":
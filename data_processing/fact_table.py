@@ -0,0 +1,121 @@
+'''
+统一事实表：按 project_config 中的 fields（统一字段及顺序）和 platform_column_maps（各平台列名）为每个平台编译一次映射，
+每日数据只经过一次 reindex 加改列名就转换为统一字段（没有的字段为空），再按 utils.schema 转换类型；
+两个平台的结果合并为一张表，按数据日期保存，视频质量数据等下游都读取它
+
+用法：python -m data_processing.fact_table --date 2025-05-31（快照日期，默认各平台最近一次）
+'''
+
+import os
+import sys
+import argparse
+from functools import lru_cache
+
+import pandas as pd
+
+# 配置模块级路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from project_config.project import fact_path
+from utils.schema import FIELD_TYPES, unified_mapping, apply_schema
+from utils.merged_store import read_store, write_store, store_exists
+from utils.content_id import ID_COLUMN
+
+# 事实表的列：统一字段（模板顺序）+ 账号、内容ID（跨天对齐、按账号汇总用）
+TEMPLATE_COLUMNS = list(FIELD_TYPES)
+KEY_COLUMNS = ["账号", ID_COLUMN]
+FACT_COLUMNS = TEMPLATE_COLUMNS + KEY_COLUMNS
+
+
+@lru_cache(maxsize=None)
+def compile_mapping(platform, with_keys=True):
+    """
+    :return: (按目标列顺序排列的来源列名，平台没有的字段为 None；目标列名)
+    """
+    mapping = unified_mapping(platform)
+    targets = FACT_COLUMNS if with_keys else TEMPLATE_COLUMNS
+    sources = [mapping[label] if label in mapping else label for label in targets]
+    return tuple(sources), tuple(targets)
+
+
+def to_fact(df, platform, with_keys=True):
+    """
+    把某个平台的每日数据（get_daily_data 的结果）转换为统一字段
+    :param with_keys: False 时只保留模板字段（视频质量数据模板格式）
+    :return: 新的 DataFrame，列为 FACT_COLUMNS（或 TEMPLATE_COLUMNS），已按统一字段的类型转换
+    """
+    sources, targets = compile_mapping(platform, with_keys)
+    fact = df.reindex(columns=list(sources)).set_axis(list(targets), axis=1)
+    return apply_schema(fact)
+
+
+def build_fact_table(date=None, platforms=("douyin", "xhs")):
+    """
+    计算各平台某一天的每日数据并合并为一张事实表
+    :param date: 快照日期（YYYY-MM-DD），None 为各平台最近一次
+    :return: 事实表，没有数据的平台会跳过
+    """
+    from data_processing.dy_video_analysis import DailyDataProcessor as DouyinProcessor
+    from data_processing.xhs_video_analysis import DailyDataProcessor as XhsProcessor
+    processors = {"douyin": DouyinProcessor, "xhs": XhsProcessor}
+
+    facts = []
+    for platform in platforms:
+        try:
+            daily = processors[platform]().get_daily_data(date)
+        except FileNotFoundError as e:
+            print(f"⚠️ {e}，事实表中跳过 {platform}")
+            continue
+        facts.append(to_fact(daily, platform))
+    if not facts:
+        return pd.DataFrame(columns=FACT_COLUMNS)
+    # 各平台的 category 取值不同，合并后重新按统一字段转换
+    return apply_schema(pd.concat(facts, ignore_index=True))
+
+
+def _partition(date):
+    return os.path.join(str(fact_path), f"{pd.Timestamp(date).strftime('%Y-%m-%d')}.arrow")
+
+
+def save_fact_table(df):
+    """
+    按数据日期保存事实表（同一天重复保存会覆盖）
+    :return: 保存的路径列表
+    """
+    paths = []
+    for date, group in df.groupby("数据日期", observed=True):
+        paths.append(write_store(group.reset_index(drop=True), _partition(date)))
+    return paths
+
+
+def load_fact_table(date, columns=None):
+    """
+    读取某个数据日期的事实表
+    :param date: 数据日期（YYYY-MM-DD，即快照日期的前一天）
+    """
+    path = _partition(date)
+    if not store_exists(path):
+        raise FileNotFoundError(f"事实表中没有 {date} 的数据，请先运行 python -m data_processing.fact_table")
+    return apply_schema(read_store(path, columns=columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把两个平台的每日数据转换为统一字段并保存为事实表")
+    parser.add_argument("--date", default=None, help="快照日期 YYYY-MM-DD，默认各平台最近一次")
+    parser.add_argument("--platforms", nargs="+", choices=("douyin", "xhs"), default=["douyin", "xhs"])
+    args = parser.parse_args()
+
+    fact = build_fact_table(args.date, args.platforms)
+    if fact.empty:
+        print("⚠️ 没有可写入事实表的数据")
+        return
+    for path in save_fact_table(fact):
+        print(f"✅ 已保存事实表：{path}")
+    print(fact.groupby("所属平台", observed=True).size().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -15,114 +15,108 @@ class DailyDataProcessor:
         if project_root not in sys.path:
             sys.path.append(project_root)
 
-        from project_config.project import xhs_data_path, xhs_yesterday_path, xhs_file_path
+        from project_config.project import (
+            xhs_data_path, xhs_yesterday_path, xhs_file_path, min_publish_date
+        )
+        from utils.snapshot_store import SnapshotStore
 
         self.xhs_data_path = xhs_data_path
         self.xhs_yesterday_path = xhs_yesterday_path
         self.xhs_file_path = xhs_file_path
+        self.snapshots = SnapshotStore()
+        # 早于该日期发布的作品不参与计算（与导出范围的起点一致）
+        self.min_date = datetime.strptime(min_publish_date, '%Y-%m-%d')
 
         # 改为小红书使用的字段
         self.compare_columns = ['观看量', '点赞', '收藏', '评论', '分享']
 
-        # 视频质量表模板字段顺序（固定）
-        self.template_columns = [
-            '所属平台', '数据日期', '作品名称', '发布时间', '体裁', '审核状态', '播放量', '完播率',
-            '5s完播率', '封面点击率', '2s跳出率', '平均播放时长', '点赞量', '分享量',
-            '评论量', '收藏量', '主页访问量', '粉丝增量'
-        ]
-
-        # 定义字段映射关系
-        self.column_mapping = {
-            '所属平台': '平台',
-            '数据日期': '日期',
-            '作品名称': '笔记标题',
-            '发布时间': '首次发布时间',
-            '体裁': '体裁',
-            '审核状态': None,
-            '播放量': '观看量',
-            '完播率': None,
-            '5s完播率': None,
-            '封面点击率': None,
-            '2s跳出率': None,
-            '平均播放时长': '人均观看时长',
-            '点赞量': '点赞',
-            '分享量': '分享',
-            '评论量': '评论',
-            '收藏量': '收藏',
-            '主页访问量': None,
-            '粉丝增量': '涨粉'
-        }
-
-    def get_daily_data(self):
-        # 读取当天数据和昨天的数据
-        data_df = pd.read_excel(self.xhs_data_path)
-        yesterday_df = pd.read_excel(self.xhs_yesterday_path)
+        # 视频质量表模板字段顺序（固定，即 project_config 中 fields 的顺序）和字段映射关系（platform_column_maps）
+        from utils.schema import FIELD_TYPES, unified_mapping
+        self.template_columns = list(FIELD_TYPES)
+        self.column_mapping = unified_mapping("xhs")
+
+    def _import_legacy(self):
+        """
+        一次性迁移：快照库中还没有该平台的数据时，把旧版本留下的昨日数据存入快照库作为第一天的对比基准
+        （日期取文件修改日期，文件本身不删除）。当前的合并结果不导入：它的修改日期不一定是数据的日期，
+        之后每次合并都会自动存入当天的快照
+        """
+        if self.snapshots.dates("xhs"):
+            return
+        self.snapshots.import_file("xhs", self.xhs_yesterday_path)
+
+    def get_daily_data(self, date=None):
+        """
+        某一天的快照减去之前最近一个快照，得到每日数据
+        :param date: 快照日期（导出当天，YYYY-MM-DD），None 为最近一次；结果中的“日期”为快照日期的前一天
+        """
+        self._import_legacy()
+        date = date or self.snapshots.latest("xhs")
+        if date is None or not self.snapshots.has("xhs", date):
+            raise FileNotFoundError(f"快照库中没有小红书 {date or ''} 的数据，请先运行导出")
+        previous = self.snapshots.latest("xhs", before=date)
+
+        # 读取当天数据和之前最近一天的数据
+        data_df = self.snapshots.load("xhs", date)
+        if previous is None:
+            print(f"⚠️ 小红书没有 {date} 之前的快照，每日数据按累计值计算")
+            yesterday_df = data_df.iloc[0:0]
+        else:
+            yesterday_df = self.snapshots.load("xhs", previous)
 
         # 确认首次发布时间字段格式为日期格式
         data_df['首次发布时间'] = pd.to_datetime(data_df['首次发布时间'])
         yesterday_df['首次发布时间'] = pd.to_datetime(yesterday_df['首次发布时间'])
 
         # 日期过滤条件
-        min_date = datetime(2025, 3, 4)
+        min_date = self.min_date
 
-        # 筛选出符合条件的数据（开始日期≥2025-03-04）
+        # 筛选出符合条件的数据（发布时间 ≥ min_publish_date）
         filtered_data_df = data_df[data_df['首次发布时间'] >= min_date].copy()
 
-        # 使用“笔记标题”作为主键进行合并
-        daily_data = pd.merge(
-            filtered_data_df,
-            yesterday_df[['笔记标题'] + self.compare_columns],
-            on='笔记标题',
-            how='left',
-            suffixes=('', '_昨日')
-        )
+        # 按内容ID（64 位整数，见 utils.content_id）对齐今天和之前最近一天的数据，不再按标题合并；
+        # 重复的内容ID会被报告并只保留一行，避免行数成倍增加
+        from utils.content_id import comparable_ids, dedupe_ids, align_previous
+        filtered_data_df, yesterday_df = comparable_ids([filtered_data_df, yesterday_df], "xhs")
+        daily_data = dedupe_ids(filtered_data_df, "xhs", date).reset_index(drop=True)
+        previous_values = align_previous(daily_data, dedupe_ids(yesterday_df, "xhs", previous), self.compare_columns)
 
-        # 处理昨日无数据的情况
-        for col in self.compare_columns:
-            yesterday_col = f"{col}_昨日"
-            daily_data[yesterday_col] = daily_data[yesterday_col].fillna(0)
-            daily_data[col] = (daily_data[col] - daily_data[yesterday_col]).abs()
-            daily_data.drop(columns=[yesterday_col], inplace=True)
+        # 之前没有的作品按 0 计算（全部指标一次相减）
+        cols = self.compare_columns
+        daily_data[cols] = (daily_data[cols] - previous_values[cols].fillna(0)).abs()
 
         daily_data = daily_data[daily_data['首次发布时间'] >= min_date].reset_index(drop=True)
 
         # 插入日期和平台字段
-        yesterday_str = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        yesterday_str = (datetime.strptime(date, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
         daily_data.insert(0, '日期', yesterday_str)
-        daily_data.insert(0, '平台', '小红书')
+        daily_data.insert(0, '平台', pd.Categorical(['小红书'] * len(daily_data)))
 
         return daily_data
 
-    def update_yesterday_data(self):
-        if os.path.exists(self.xhs_yesterday_path):
-            os.remove(self.xhs_yesterday_path)
-            print(f"✅ 已删除旧的昨日数据文件: {self.xhs_yesterday_path}")
-        else:
-            print("⚠️ 旧的昨日数据文件不存在，无需删除。")
-
-        new_yesterday_path = os.path.join(self.xhs_file_path, "yesterday.xlsx")
+    def get_window_data(self, date=None, windows=(1, 7, 30)):
+        """
+        多个时间窗口的带符号增量（不取绝对值），见 data_processing.delta_engine
+        :param date: 快照日期，None 为最近一次
+        """
+        self._import_legacy()
+        from data_processing.delta_engine import window_deltas
+        return window_deltas("xhs", end=date, windows=windows, store=self.snapshots)
 
-        if os.path.exists(self.xhs_data_path):
-            os.rename(self.xhs_data_path, new_yesterday_path)
-            print(f"✅ 已将 {self.xhs_data_path} 重命名为 {new_yesterday_path}")
-        else:
-            print("❌ 无法重命名，xhs_data_path 文件不存在。")
+    def update_yesterday_data(self):
+        """
+        快照库按日期保存每天的数据，不再删除、改名昨日数据文件；这里只在快照库为空时导入旧版本的昨日数据（重复调用结果相同）
+        """
+        self._import_legacy()
+        print(f"✅ 快照库已有的日期：{', '.join(self.snapshots.dates('xhs')[-3:])}")
 
-    def convert_to_video_quality_format(self):
+    def convert_to_video_quality_format(self, date=None):
         """
-        获取 daily_data，并将其转换为 视频质量数据 模板格式。
+        获取 daily_data，并将其转换为 视频质量数据 模板格式（映射见 data_processing.fact_table，一次转换全部字段）。
         返回：格式统一的新 DataFrame
         """
-        df = self.get_daily_data()
-        converted_df = pd.DataFrame(columns=self.template_columns)
-        for target_col in self.template_columns:
-            source_col = self.column_mapping.get(target_col)
-            if source_col in df.columns:
-                converted_df[target_col] = df[source_col]
-            else:
-                converted_df[target_col] = None
-        converted_df['所属平台'] = '小红书'
-        return converted_df
+        from data_processing.fact_table import to_fact
+        return to_fact(self.get_daily_data(date), "xhs", with_keys=False)
 
 # 示例调用
 if __name__ == "__main__":
@@ -1,24 +1,105 @@
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
 from utils.init_path import setup_project_root
 setup_project_root()
 
+from project_config.project import export_engine
 from spiders.xhs import Xhs
 from spiders.douyin import Douyin
+from utils.browser_pool import BrowserPool, set_active_pool
+from utils.daemon import SchedulerDaemon
+from utils.queue_mode import run_coordinator, run_worker
+from utils.run_journal import failed_accounts
+
+PLATFORM_CLASSES = {"douyin": Douyin, "xhs": Xhs}
 
-if __name__ == "__main__":
-    print("📦 程序启动")
 
+def run_platform(name, run_all):
+    """
+    运行单个平台的全部账号（导出完成后该平台立即合并）
+    :return: {"name", "ok", "seconds", "accounts", "failed", "error"}
+    """
+    print(f"▶ 开始处理 {name} 数据")
+    start = time.perf_counter()
+    summary = {"name": name, "ok": True, "accounts": 0, "failed": 0, "error": None}
     try:
-        print("▶ 开始处理 Douyin 数据")
-        Douyin.run_all()
-        print("✅ Douyin 处理完成")
+        results = run_all() or {}
+        summary["accounts"] = len(results)
+        summary["failed"] = len(failed_accounts(results))
+        summary["ok"] = summary["failed"] == 0
+        print(f"✅ {name} 处理完成")
     except Exception as e:
-        print(f"❌ Douyin 出错: {e}")
+        summary["ok"] = False
+        summary["error"] = e
+        print(f"❌ {name} 出错: {e}")
+    summary["seconds"] = time.perf_counter() - start
+    return summary
 
+
+def run_daemon(run_now=False):
+    """
+    常驻运行：按 project_config 中的 daemon_schedules 定时导出，浏览器在各次任务之间复用
+    """
+    pool = BrowserPool() if export_engine == "selenium" else None
+    set_active_pool(pool)
+    # 同一天会运行多次，每次都重新导出全部账号（resume=False），不沿用当天已合并的记录
+    jobs = {
+        "douyin": lambda: run_platform("Douyin", lambda: Douyin.run_all(resume=False)),
+        "xhs": lambda: run_platform("XHS", lambda: Xhs.run_all(resume=False)),
+    }
     try:
-        print("▶ 开始处理 XHS 数据")
-        Xhs.run_all()
-        print("✅ XHS 处理完成")
-    except Exception as e:
-        print(f"❌ XHS 出错: {e}")
+        SchedulerDaemon(jobs, pool=pool).run_forever(run_now=run_now)
+    finally:
+        set_active_pool(None)
+        if pool is not None:
+            pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="抖音、小红书内容数据导出")
+    parser.add_argument("--serial", action="store_true", help="两个平台依次运行（默认同时运行）")
+    parser.add_argument("--daemon", action="store_true", help="常驻运行，按 daemon_schedules 定时导出")
+    parser.add_argument("--now", action="store_true", help="与 --daemon 一起使用：启动后先立即运行一次")
+    parser.add_argument("--queue-coordinator", action="store_true", help="队列模式：分发账号任务、本机参与导出，结束后统一合并")
+    parser.add_argument("--queue-worker", action="store_true", help="队列模式：只从共享队列领取任务导出")
+    parser.add_argument("--no-local-work", action="store_true", help="与 --queue-coordinator 一起使用：本机只分发和合并")
+    parser.add_argument("--reset", action="store_true", help="与 --queue-coordinator 一起使用：清空当天已有任务，全部重新导出")
+    args = parser.parse_args()
+
+    if args.queue_worker:
+        run_worker(PLATFORM_CLASSES)
+        sys.exit(0)
+    if args.queue_coordinator:
+        print("📦 队列模式：协调节点启动")
+        results = run_coordinator(PLATFORM_CLASSES, work=not args.no_local_work, reset=args.reset)
+        for platform, s in results.items():
+            print(f" {'✅' if s['ok'] else '❌'} {platform}: {s['accounts']} 个账号，失败 {s['failed']} 个")
+        sys.exit(0 if all(s["ok"] for s in results.values()) else 1)
+
+    if args.daemon:
+        print("📦 守护进程启动")
+        run_daemon(run_now=args.now)
+        sys.exit(0)
+
+    print("📦 程序启动")
+    start = time.perf_counter()
+    platforms = [("Douyin", Douyin.run_all), ("XHS", Xhs.run_all)]
+
+    if args.serial:
+        summaries = [run_platform(name, run_all) for name, run_all in platforms]
+    else:
+        # 两个平台同时运行，浏览器总数由 project_config 中的 max_total_browsers 统一限制
+        with ThreadPoolExecutor(max_workers=len(platforms)) as pool:
+            futures = [pool.submit(run_platform, name, run_all) for name, run_all in platforms]
+            summaries = [f.result() for f in futures]
 
-    print("🏁 程序结束")
+    print("\n⏱️ 各平台用时：")
+    for s in summaries:
+        status = "✅" if s["ok"] else "❌"
+        detail = f"出错: {s['error']}" if s["error"] else f"{s['accounts']} 个账号，失败 {s['failed']} 个"
+        print(f" {status} {s['name']}: {s['seconds']:.1f}s（{detail}）")
+    print(f"🏁 程序结束，总用时 {time.perf_counter() - start:.1f}s")
+    sys.exit(0 if all(s["ok"] for s in summaries) else 1)
@@ -7,17 +7,169 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 xhs_file_path = BASE_DIR / "xlsx_file" / "xhs"
 xhs_data_path = xhs_file_path / "汇总笔记列表明细表.xlsx"
 xhs_yesterday_path = xhs_file_path / "yesterday.xlsx"
+xhs_staging_path = xhs_file_path / "staging"   # 每个账号单独的下载目录：staging/<账号名>
+xhs_store_path = xhs_file_path / "汇总笔记列表明细表.arrow"           # 合并结果（带类型的列式文件，分析阶段直接读取）
 
 # 抖音路径
 dy_file_path = BASE_DIR / "xlsx_file" / "douyin"
 dy_data_path = dy_file_path / "douyin_汇总数据.xlsx"
 dy_yesterday_path = dy_file_path / "yesterday.xlsx"
+dy_staging_path = dy_file_path / "staging"     # 每个账号单独的下载目录：staging/<账号名>
+dy_store_path = dy_file_path / "douyin_汇总数据.arrow"                # 合并结果（带类型的列式文件，分析阶段直接读取）
+
+# 合并结果是否另存一份 Excel（xhs_data_path / dy_data_path）供人工查看；分析阶段只读取上面的 .arrow 文件
+merged_excel_export = False
+# 快照库：每天的合并结果按 平台/日期 保存（只增不删），每日数据由当天和之前最近一天的快照做差得到
+snapshot_path = BASE_DIR / "xlsx_file" / "snapshots"
+# 统一事实表：两个平台的每日数据按 fields 转换为统一字段后，按数据日期保存在一起（视频质量数据等下游都读取它）
+fact_path = BASE_DIR / "xlsx_file" / "facts"
+# 流式合并：逐个账号解析后立即追加到合并结果并释放，内存峰值只与单个账号有关（账号多、全量导出或内存小的机器上开启，需要 pyarrow）
+merge_streaming = False
 
 # 驱动路径
 driver_path = BASE_DIR / "project_config" / "msedgedriver.exe"
 
 # Cookie 路径
 pkl_path = BASE_DIR / "pkl"
+cookie_index_path = pkl_path / "cookie_index.json"   # cookie 索引：各账号的过期时间、最近成功时间
+
+# Cookie 检查设置
+skip_expired_accounts = True    # True：跳过已过期账号；False：只提示，仍然启动浏览器
+cookie_expiry_margin = 600      # 距离过期不足多少秒即视为过期
+cookie_preflight = False        # 启动浏览器前先用 HTTP 请求确认登录状态
+
+# 日志路径（并行模式下每个账号单独一个日志文件）
+log_path = BASE_DIR / "logs"
+
+# 运行状态文件目录（定位方式缓存等）
+state_path = BASE_DIR / "state"
+locator_cache_path = state_path / "locator_cache.json"
+run_journal_path = state_path / "run_journal.json"    # 断点续跑记录：每个账号当天进行到哪一步
+daemon_status_path = state_path / "daemon_status.json"  # 守护进程状态：队列长度、各任务用时
+
+# 失败重试设置
+max_account_retries = 3      # 每个账号单次运行中最多尝试次数
+retry_backoff_base = 30      # 第 n 次重试前等待 retry_backoff_base * 2^(n-1) 秒
+retry_backoff_max = 300      # 单次等待上限（秒）
+
+# 队列模式（python main.py --queue-coordinator / --queue-worker）：多个 worker 进程或多台机器共同导出
+# 多台机器使用时，两个路径都要放在所有机器都能访问的共享盘上，且每台 worker 的 pkl 文件夹中都要有账号的 cookie
+work_queue_path = state_path / "work_queue.sqlite"                # 任务队列（SQLite 文件）
+queue_results_path = BASE_DIR / "xlsx_file" / "queue_results"     # worker 导出的文件回传到这里，由协调节点合并
+queue_lease_seconds = 300       # 租约时长：worker 超过这么久没有心跳，任务交给其他 worker
+queue_heartbeat_interval = 60   # 心跳间隔（秒）
+queue_max_attempts = 3          # 每个任务最多尝试次数
+queue_idle_exit = 120           # worker 连续这么多秒没有租到任务即退出（None 为一直等待）
+queue_merge_timeout = 3600      # 协调节点等待全部任务结束的最长时间（秒）
+
+# 并行设置
+max_browser_workers = 4      # 同时运行的浏览器 worker 数量上限
+browser_memory_mb = 700      # 单个 Edge 实例预估占用内存（MB），按可用内存自动限制并发
+max_total_browsers = 6       # 抖音、小红书同时运行时，整个程序同时打开的浏览器总数上限
+
+# 平台限速（浏览器方式）：每个平台每分钟最多开始多少次导出、同时最多几个导出会话（所有并行 worker 共用）；
+# 默认值不低于 max_browser_workers，正常情况下不限制并行，只在检测到限流或导出失败时自动降速
+rate_limits = {
+    "douyin": {"exports_per_minute": 30, "max_sessions": max_browser_workers},
+    "xhs": {"exports_per_minute": 30, "max_sessions": max_browser_workers},
+}
+# http 方式的限速，格式同 rate_limits；默认 None 不限速（并发只由 http_max_workers 控制），需要时再按平台填写
+http_rate_limits = None
+rate_limit_min_per_minute = 1     # 自动降速的下限
+rate_limit_backoff = 0.5          # 检测到限流或导出失败时，速率乘以该系数
+rate_limit_recover = 1            # 每次导出成功后速率增加多少（次/分钟），直到恢复配置值
+
+# 浏览器模式："normal" 有界面、最大化窗口；"lean" 无头模式，屏蔽图片/视频/字体/统计脚本，适合服务器上多开
+browser_mode = "normal"
+lean_window_size = (1280, 800)
+lean_browser_memory_mb = 350    # lean 模式下单个 Edge 实例预估占用内存（MB），代替 browser_memory_mb 计算并发上限
+lean_blocked_urls = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.m3u8", "*.ts", "*.webm", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*hm.baidu.com*", "*mcs.snssdk.com*", "*mon.zijieapi.com*",
+    "*apm.volccdn.com*", "*t2.xiaohongshu.com*", "*apm-fe.xiaohongshu.com*",
+]
+
+# 守护进程设置（python main.py --daemon）：按时间表定时运行，浏览器常驻复用
+daemon_schedules = {
+    "douyin": ["09:00", "21:00"],
+    "xhs": ["09:30", "21:30"],
+}
+daemon_poll_interval = 15       # 检查时间表、刷新状态文件的间隔（秒）
+daemon_status_port = None       # 本地状态接口端口（如 8766，访问 http://127.0.0.1:8766/），None 时只写状态文件
+browser_max_uses = 20           # 常驻浏览器服务多少个账号后关闭重建，避免内存持续增长
+
+# 页面步骤设置：每个点击步骤最多等待多久，找不到元素时立即终止该账号的流程
+step_timeout = 8
+
+# 浏览器登录设置
+cookie_inject_mode = "cdp"      # "cdp"：空白页上一次性注入全部 cookie 后直接打开数据中心；"legacy"：打开首页逐个添加再刷新
+use_browser_profile = False     # 为每个账号保存浏览器配置目录，再次运行时直接复用登录状态
+profile_path = BASE_DIR / "browser_profiles"
+
+# 下载设置
+download_timeout = 120       # 点击导出后等待文件下载完成的最长时间（秒）
+export_capture = False       # True：通过 DevTools 在内存中捕获导出文件，不经过下载目录
+archive_raw_exports = False  # 内存捕获模式下是否另存原始导出文件
+archive_path = BASE_DIR / "xlsx_file" / "archive"
+
+# 导出时间范围（按作品发布时间）
+min_publish_date = "2025-03-04"   # 早于该日期发布的作品不导出、不参与每日数据计算
+# 增量导出（可选）：True 时从账号上次导出成功的日期往前 incremental_lookback_days 天开始导出，导出更快，
+# 但更早发布的作品不再出现在导出中，它们之后的播放、点赞等增长也不会计入每日数据、多窗口增量和事实表；
+# 默认 False，不修改页面上的日期范围，按平台默认范围导出（http 方式按 export_max_days 内的范围导出）
+incremental_export = False
+incremental_lookback_days = 30    # 增量导出时，发布不超过这么多天的作品每天重新导出
+export_max_days = 90              # 平台日期选择器允许的最长范围（天），设置导出范围时开始日期不早于今天往前这么多天
+
+# 读取导出文件时只保留这些列（文件中没有的列忽略），设为 None 则读取全部列
+export_columns = {
+    "douyin": [
+        "作品名称", "发布时间", "体裁", "审核状态", "播放量", "完播率", "5s完播率", "封面点击率", "2s跳出率",
+        "平均播放时长", "点赞量", "分享量", "评论量", "收藏量", "主页访问量", "粉丝增量",
+    ],
+    "xhs": ["笔记标题", "首次发布时间", "体裁", "观看量", "点赞", "收藏", "评论", "分享", "人均观看时长", "涨粉"],
+}
+# 导出文件中作品自身 ID 的列名（有则优先用作内容ID，即使不在 export_columns 中也会读取）；没有时用 账号+标题+发布日期 的哈希
+content_id_columns = {"douyin": ["作品ID", "视频ID"], "xhs": ["笔记ID"]}
+xlsx_read_workers = None     # 合并时并行解析 xlsx 的进程数，None 为 CPU 核数
+parse_cache_path = state_path / "parse_cache"   # 解析结果缓存：按文件内容哈希保存解析后的数据，内容未变的文件不再重新解析
+parse_cache_max_mb = 512     # 缓存总大小上限（MB），超出时删除最久未使用的条目；设为 0 则关闭缓存
+
+# 导出方式："selenium" 启动浏览器点击导出；"http" 用 pkl 中的 cookie 直接请求导出接口
+export_engine = "selenium"
+http_max_workers = 16        # http 方式下的并发数（不启动浏览器，不受内存限制）
+http_timeout = 60            # 单次导出请求超时（秒）
+
+# 登录状态检查接口（cookie_preflight 使用，返回 JSON 中 status_code/code 为 0 即视为已登录）
+preflight_api = {
+    "douyin": "https://creator.douyin.com/web/api/media/user/info/",
+    "xhs": "https://creator.xiaohongshu.com/api/galaxy/user/info",
+}
+
+# 各平台登录相关的站点：注入 cookie 前清空这些站点的 cookie 和存储（localStorage、IndexedDB 等），避免串号
+platform_origins = {
+    "douyin": ["https://creator.douyin.com", "https://www.douyin.com", "https://sso.douyin.com"],
+    "xhs": ["https://creator.xiaohongshu.com", "https://www.xiaohongshu.com", "https://customer.xiaohongshu.com"],
+}
+
+# 创作者中心导出接口（在浏览器开发者工具 Network 面板中点击“导出数据”抓取后填写 url 和 params）；
+# url 为空时 http 方式拒绝运行。本地调试可先运行 python -m utils.stub_export_server，再把 url 改成 http://127.0.0.1:8765/...
+http_export_api = {
+    "douyin": {
+        "url": "",
+        "method": "GET",
+        "params": {},   # 字符串中的 {start_date}、{end_date} 会替换为导出时间范围（YYYY-MM-DD）
+        "referer": "https://creator.douyin.com/creator-micro/data-center/content",
+    },
+    "xhs": {
+        "url": "",
+        "method": "GET",
+        "params": {},
+        "referer": "https://creator.xiaohongshu.com/statistics/data-analysis",
+    },
+}
 
 
 # 字段映射关系（name到label）
@@ -43,6 +195,30 @@ fields = [
     ]
 
 
+# 各平台导出列与统一字段（fields 中的 label）的对应关系，None 表示该平台没有此字段；
+# 所属平台、数据日期不是导出列，由每日数据计算时添加
+platform_column_maps = {
+    "douyin": {f["label"]: f["label"] for f in fields if f["label"] not in ("所属平台", "数据日期")},
+    "xhs": {
+        '作品名称': '笔记标题',
+        '发布时间': '首次发布时间',
+        '体裁': '体裁',
+        '审核状态': None,
+        '播放量': '观看量',
+        '完播率': None,
+        '5s完播率': None,
+        '封面点击率': None,
+        '2s跳出率': None,
+        '平均播放时长': '人均观看时长',
+        '点赞量': '点赞',
+        '分享量': '分享',
+        '评论量': '评论',
+        '收藏量': '收藏',
+        '主页访问量': None,
+        '粉丝增量': '涨粉',
+    },
+}
+
 if __name__ == '__main__':
     print(dy_file_path)
 
@@ -1,122 +1,280 @@
+import io
+import os
 import pickle
 import time
 import glob
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.edge.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 # 自动添加项目根目录到 sys.path
 from utils.init_path import setup_project_root
 setup_project_root()
 from project_config.project import (
-    driver_path, pkl_path, dy_file_path
+    driver_path, pkl_path, dy_file_path, dy_staging_path, log_path, export_engine,
+    skip_expired_accounts, cookie_preflight, cookie_inject_mode,
+    export_capture, archive_raw_exports, merged_excel_export, merge_streaming
 )
+from utils.accounts import account_name_from_cookie, account_staging_dir
+from utils.worker_pool import resolve_worker_count, run_in_pool
+from utils.download_watcher import snapshot_files, wait_for_download_file
+from spiders.http_export import run_http_export, require_configured
+from utils.cookie_vault import CookieVault
+from utils.browser import build_edge_options, prepare_driver, account_profile_dir, login_via_cdp
+from utils.export_capture import reset_capture, capture_export_response, archive_export
+from utils.locators import find_element, type_date, StepFailed, StepTimer
+from utils.run_journal import RunJournal, run_with_retry, failed_accounts
+from utils.browser_pool import account_driver, point_downloads
+from utils.export_window import account_windows
+from utils.rate_limiter import limiter_for, page_throttled
+from utils.xlsx_reader import read_export_file, read_export_files
+from utils.merged_store import write_store, read_store
+from utils.streaming_merge import stream_merge, streaming_available
+from utils.schema import apply_schema
+from utils.snapshot_store import record_snapshot, carry_over, CARRIED_KEY
 
 # 动态获取 Douyin Cookie 路径列表
 def get_douyin_cookie_paths():
     return [str(p.resolve()) for p in pkl_path.glob("douyin_*.pkl") if p.suffix == ".pkl"]
 
 class Douyin:
-    def __init__(self, url, cookies_file):
+    def __init__(self, url, cookies_file, engine=None, driver=None):
+        """
+        :param engine: "selenium" 或 "http"，None 时使用 project_config 中的 export_engine
+        :param driver: 浏览器池借出的浏览器，传入时不再启动新浏览器，运行结束后也不关闭
+        """
         self.url = url
         self.cookies_file = cookies_file
         self.data_center_url = "https://creator.douyin.com/creator-micro/data-center/content"
+        self.account = account_name_from_cookie(cookies_file)
+        self.download_path = account_staging_dir(dy_staging_path, cookies_file)
+        self.export_clicked_at = None
+        self.downloaded_file = None
+        self.export_buffer = None
+        self.download_latency = None
+        self.login_seconds = None
+        self.steps = StepTimer()
+        self.journal = None
+        self.export_window = None   # (开始日期, 结束日期)，由 run_all 按账号上次导出成功的时间设置
+        self.throttled = False      # 导出失败时页面或接口是否提示请求过于频繁
+        self.step_failed = None     # 页面步骤确定性失败（StepFailed）时的原因，这类失败重试也不会成功
+        self.engine = engine or export_engine
+        self.driver = None
+        self.profile_dir = None
+        self.pooled = driver is not None
+        if self.engine == "http":
+            return
+        if self.pooled:
+            self.driver = driver
+            point_downloads(self.driver, self.download_path)
+            return
 
-        edge_options = Options()
-        edge_options.add_experimental_option("prefs", {
-            "download.default_directory": str(dy_file_path),
-            "download.prompt_for_download": False,
-            "download.directory_upgrade": True,
-            "safebrowsing.enabled": True
-        })
+        self.profile_dir = account_profile_dir("douyin", self.account)
+        edge_options = build_edge_options(self.download_path, self.profile_dir)
 
         self.driver = webdriver.Edge(
             service=Service(str(driver_path)),
             options=edge_options
         )
-        self.driver.maximize_window()
+        prepare_driver(self.driver, self.download_path)
 
     def load_cookies(self):
         try:
-            with open(self.cookies_file, "rb") as cookie_file:
-                cookies = pickle.load(cookie_file)
-                self.driver.get(self.url)
-                self.driver.delete_all_cookies()
-                for cookie in cookies:
-                    if 'expiry' in cookie:
-                        cookie['expiry'] = int(cookie['expiry'])
-                    self.driver.add_cookie(cookie)
-                self.driver.refresh()
-                print(f"✅ Loaded cookies from {self.cookies_file}")
-                self._post_login_flow()
+            start = time.perf_counter()
+            if cookie_inject_mode == "cdp":
+                login_via_cdp(self.driver, self.cookies_file, self.data_center_url, self.profile_dir)
+            else:
+                with open(self.cookies_file, "rb") as cookie_file:
+                    cookies = pickle.load(cookie_file)
+                    self.driver.get(self.url)
+                    self.driver.delete_all_cookies()
+                    for cookie in cookies:
+                        if 'expiry' in cookie:
+                            cookie['expiry'] = int(cookie['expiry'])
+                        self.driver.add_cookie(cookie)
+                    self.driver.refresh()
+                self.driver.get(self.data_center_url)
+            self.wait_for_page_ready()
+            self.login_seconds = time.perf_counter() - start
+            print(f"✅ Loaded cookies from {self.cookies_file}，进入数据中心用时 {self.login_seconds:.1f}s")
+            self._record("cookies_loaded")
+            self._post_login_flow()
         except FileNotFoundError:
             print(f"❌ Cookie file not found: {self.cookies_file}")
 
     def _post_login_flow(self):
-        self.driver.get(self.data_center_url)
-        self.wait_for_page_ready()
-        self.click_tgzp_tab()
-        self.click_post_list_tab()
-        self.click_export_data_button()
+        with self.steps.step("投稿作品"):
+            self.click_tgzp_tab()
+        with self.steps.step("投稿列表"):
+            self.click_post_list_tab()
+        if self.export_window is not None:
+            with self.steps.step("导出范围"):
+                self.set_export_window()
+        with self.steps.step("导出数据"):
+            self.click_export_data_button()
+
+    def _check_throttled(self):
+        """
+        导出失败时检查页面是否提示请求过于频繁，结果交给平台限速器降速
+        """
+        self.throttled = page_throttled(self.driver)
+        if self.throttled:
+            print("🚦 页面提示操作过于频繁，已被平台限流")
+
+    def _record(self, stage, **extra):
+        """
+        写入断点续跑记录（由 run_all 设置 self.journal）
+        """
+        if self.journal is not None:
+            self.journal.record(self.cookies_file, stage, **extra)
 
     def wait_for_page_ready(self, timeout=30):
         WebDriverWait(self.driver, timeout).until(
             lambda d: d.execute_script("return document.readyState") == 'complete'
         )
 
+    # 各步骤的定位方式，按优先级排列：(By, 表达式[, 元素需包含的文字])
+    TGZP_TAB_LOCATORS = [
+        (By.CSS_SELECTOR, "#semiTab1", "投稿作品"),
+        (By.XPATH, "//div[@id='semiTab1' and text()='投稿作品']"),
+        (By.XPATH, "//div[@role='tab' and normalize-space(.)='投稿作品']"),
+    ]
+    POST_LIST_LOCATORS = [
+        (By.CSS_SELECTOR, "#semiTabPanel1 span.douyin-creator-pc-radio-addon", "投稿列表"),
+        (By.XPATH, "//div[@id='semiTabPanel1']//span[contains(@class, 'douyin-creator-pc-radio-addon') and normalize-space(text())='投稿列表']"),
+        (By.XPATH, "//span[normalize-space(text())='投稿列表']"),
+    ]
+    START_DATE_LOCATORS = [
+        (By.CSS_SELECTOR, "#semiTabPanel1 input[placeholder='开始日期']"),
+        (By.XPATH, "//div[@id='semiTabPanel1']//input[@placeholder='开始日期']"),
+    ]
+    END_DATE_LOCATORS = [
+        (By.CSS_SELECTOR, "#semiTabPanel1 input[placeholder='结束日期']"),
+        (By.XPATH, "//div[@id='semiTabPanel1']//input[@placeholder='结束日期']"),
+    ]
+    EXPORT_BUTTON_LOCATORS = [
+        (By.CSS_SELECTOR, "div[class*='container-'] button", "导出数据"),
+        (By.XPATH, "//div[contains(@class,'container-ttkmFy')]//button[.//span[text()='导出数据']]"),
+        (By.XPATH, "//button[.//span[normalize-space(text())='导出数据']]"),
+    ]
+
     def click_tgzp_tab(self):
-        locator = (By.XPATH, "//div[@id='semiTab1' and text()='投稿作品']")
         try:
-            element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(locator)
-            )
-            self.driver.execute_script("arguments[0].click();", element)
-            print("✅ 点击“投稿作品”成功")
-        except Exception as e:
+            element = find_element(self.driver, "douyin.投稿作品", self.TGZP_TAB_LOCATORS, visible=True)
+        except StepFailed as e:
             print(f"❌ 点击“投稿作品”失败: {e}")
+            raise
+        self.driver.execute_script("arguments[0].click();", element)
+        print("✅ 点击“投稿作品”成功")
 
     def click_post_list_tab(self):
-        locator = (By.XPATH, "//div[@id='semiTabPanel1']//span[contains(@class, 'douyin-creator-pc-radio-addon') and normalize-space(text())='投稿列表']")
         try:
-            element = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(locator)
-            )
-            self.driver.execute_script("arguments[0].click();", element)
-            print("✅ 点击“投稿列表”成功")
-        except Exception as e:
+            element = find_element(self.driver, "douyin.投稿列表", self.POST_LIST_LOCATORS, visible=True)
+        except StepFailed as e:
             print(f"❌ 点击“投稿列表”失败: {e}")
+            raise
+        self.driver.execute_script("arguments[0].click();", element)
+        print("✅ 点击“投稿列表”成功")
+
+    def set_export_window(self):
+        """
+        把投稿列表的发布时间范围设为 self.export_window（只在增量导出时调用），日期组件没有接受时抛出 StepFailed，不按错误的范围导出
+        """
+        start_date, end_date = self.export_window
+        try:
+            start_input = find_element(self.driver, "douyin.开始日期", self.START_DATE_LOCATORS)
+            end_input = find_element(self.driver, "douyin.结束日期", self.END_DATE_LOCATORS)
+            # Semi 日期组件不响应直接修改 value，用键盘输入后确认显示的日期
+            type_date(self.driver, start_input, start_date, "douyin.开始日期")
+            type_date(self.driver, end_input, end_date, "douyin.结束日期")
+        except StepFailed as e:
+            print(f"❌ 设置导出范围失败: {e}")
+            raise
+        # 修改日期后列表会重新加载，稍等再导出
+        time.sleep(1.5)
+        print(f"✅ 导出范围：{start_date} ~ {end_date}")
 
     def click_export_data_button(self):
-        locator = (By.XPATH, "//div[contains(@class,'container-ttkmFy')]//button[.//span[text()='导出数据']]")
         try:
-            time.sleep(2)
-            button = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located(locator)
-            )
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-            self.driver.execute_script("arguments[0].click();", button)
-            print("✅ 点击导出数据成功")
-        except Exception as e:
+            button = find_element(self.driver, "douyin.导出数据", self.EXPORT_BUTTON_LOCATORS)
+        except StepFailed as e:
             print(f"❌ 点击导出数据失败: {e}")
+            raise
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
+        if export_capture:
+            reset_capture(self.driver)
+        self.driver.execute_script("arguments[0].click();", button)
+        self.export_clicked_at = time.perf_counter()
+        self._record("export_clicked")
+        print("✅ 点击导出数据成功")
+
+    def capture_export(self):
+        """
+        在内存中捕获导出文件，结果保存在 self.export_buffer
+        """
+        print("⏳ 等待捕获导出响应...")
+        data = capture_export_response(self.driver)
+        if data is None:
+            print("❌ 未捕获到导出文件响应")
+            self._check_throttled()
+            return None
+        self.export_buffer = io.BytesIO(data)
+        self.download_latency = time.perf_counter() - self.export_clicked_at
+        self._record("file_landed", file=f"memory://douyin/{self.account}")
+        print(f"📥 已在内存中捕获导出文件（{len(data) / 1024:.0f} KB），用时 {self.download_latency:.1f}s")
+        if archive_raw_exports:
+            print(f"🗄️ 原始文件已归档：{archive_export(data, 'douyin', self.account)}")
+        return self.export_buffer
+
+    def wait_for_download(self, before):
+        """
+        等待导出文件下载完成，记录从点击导出到文件落地的用时
+        :param before: 点击导出前下载目录的文件快照
+        """
+        print("⏳ 等待下载完成...")
+        file = wait_for_download_file(self.download_path, "*data*.xlsx", before=before)
+        if file is None:
+            print("❌ 等待下载超时，未发现导出文件")
+            self._check_throttled()
+            return None
+        self.downloaded_file = file
+        self.download_latency = time.perf_counter() - self.export_clicked_at
+        self._record("file_landed", file=file)
+        print(f"📥 下载完成：{os.path.basename(file)}，用时 {self.download_latency:.1f}s")
+        return file
 
     def run(self):
+        if self.engine == "http":
+            file = run_http_export(self, "douyin", f"data_{self.account}.xlsx")
+            if file:
+                self._record("file_landed", file=file)
+            return
         try:
+            before = snapshot_files(self.download_path, "*data*.xlsx")
             self.load_cookies()
-            time.sleep(10)
+            if self.export_clicked_at is not None:
+                if export_capture:
+                    self.capture_export()
+                else:
+                    self.wait_for_download(before)
+        except StepFailed as e:
+            self.step_failed = str(e)
+            print(f"⛔ 流程已终止：{e}")
         except Exception as e:
             print(f"运行出错：{e}")
         finally:
-            self.driver.quit()
+            if self.steps.timings:
+                print(f"⏱️ 步骤用时：{self.steps.summary()}")
+            if self.driver and not self.pooled:
+                self.driver.quit()
 
     @classmethod
-    def cleanup_temp_files(cls, output_path, keyword="data"):
+    def cleanup_temp_files(cls, files):
         deleted = 0
-        for file in glob.glob(os.path.join(output_path, f"*{keyword}*.xlsx")):
+        for file in files:
             try:
                 os.remove(file)
                 print(f"🗑️ 已删除临时文件: {file}")
@@ -127,31 +285,147 @@ class Douyin:
             print("⚠️ 没有发现需要删除的临时文件")
 
     @classmethod
-    def merge_xlsx_files(cls, output_path):
+    def read_export(cls, file, account=None):
+        """
+        读取单个账号的导出文件
+        :param file: 文件路径，或内存捕获得到的 BytesIO
+        :param account: 账号名，None 时取文件所在的暂存目录名
+        """
+        return read_export_file(file, "douyin", account=account)
+
+    @classmethod
+    def merge_xlsx_files(cls, output_path, parsed=None, extra_files=None):
+        """
+        合并各账号暂存目录中的导出文件
+        :param output_path: 汇总文件输出目录
+        :param parsed: 已提前解析好的 {文件路径: DataFrame}，这些文件不再重复读取；
+                       内存捕获的导出以 memory:// 开头，不对应磁盘文件
+        :param extra_files: 暂存目录以外需要一起合并的文件（如队列模式回传的文件），合并后不删除
+        :return: 合并后的 DataFrame（流式合并时为合并结果的路径），没有可合并的文件时返回 None
+        """
         print("🔄 开始合并 Excel 文件...")
-        all_files = glob.glob(os.path.join(output_path, "*data*.xlsx"))
+        parsed = dict(parsed or {})
+        disk_files = glob.glob(os.path.join(str(dy_staging_path), "*", "*data*.xlsx"))
+        all_files = disk_files + [f for f in (extra_files or []) if f not in disk_files]
+        all_files += [k for k in parsed if k not in all_files]
+        # 当天已合并过的其他账号（断点续跑时已跳过、暂存文件已删除）从当天的快照中保留
+        carried = carry_over("douyin", all_files)
+        if carried is not None:
+            parsed[CARRIED_KEY] = carried
+            all_files.insert(0, CARRIED_KEY)
+        store_path = os.path.join(output_path, "douyin_汇总数据.arrow")
+        if merge_streaming and streaming_available():
+            return cls._stream_merge(all_files, disk_files, parsed, store_path)
+
+        # 没有提前解析的文件一次性并行读取
+        frames, errors = read_export_files([f for f in all_files if f not in parsed], "douyin")
+        frames.update(parsed)
         df_list = []
+        merged_files = []
         for file in all_files:
-            try:
-                df = pd.read_excel(file)
-                df["来源文件"] = os.path.basename(file)
-                df_list.append(df)
-            except Exception as e:
-                print(f"⚠️ 无法读取 {file}: {e}")
+            if file in errors:
+                print(f"⚠️ 无法读取 {file}: {errors[file]}")
+                continue
+            df_list.append(frames[file])
+            if file in disk_files:
+                merged_files.append(file)
 
         if df_list:
-            merged_df = pd.concat(df_list, ignore_index=True)
-            final_file = os.path.join(output_path, "douyin_汇总数据.xlsx")
-            merged_df.to_excel(final_file, index=False)
-            print(f"📊 已成功导出汇总文件：{final_file}")
+            merged_df = cls._finalize_types(pd.concat(df_list, ignore_index=True))
+            store_file = write_store(merged_df, store_path)
+            print(f"📊 已成功保存合并结果：{store_file}")
+            record_snapshot("douyin", store_file)
+            if merged_excel_export:
+                final_file = os.path.join(output_path, "douyin_汇总数据.xlsx")
+                merged_df.to_excel(final_file, index=False)
+                print(f"📊 已成功导出汇总文件：{final_file}")
         else:
             print("❌ 没有可合并的xlsx文件")
-            return
+            return None
+
+        cls.cleanup_temp_files(merged_files)
+        return merged_df
 
-        cls.cleanup_temp_files(output_path, keyword="data")
+    @staticmethod
+    def _finalize_types(df):
+        """
+        合并结果按 utils.schema 登记的类型保存（各账号的 category 取值不同，合并后需要重新转换）
+        """
+        return apply_schema(df, "douyin")
 
     @classmethod
-    def run_all(cls):
+    def _stream_merge(cls, all_files, disk_files, parsed, store_path):
+        """
+        流式合并：逐个账号读取后立即追加到合并结果并释放，内存峰值只与单个账号有关
+        :return: 合并结果的路径，没有可合并的文件时返回 None
+        """
+        summary = stream_merge(all_files, "douyin", store_path, parsed=parsed, prepare=cls._finalize_types)
+        for file, e in summary["errors"].items():
+            print(f"⚠️ 无法读取 {file}: {e}")
+        if summary["path"] is None:
+            print("❌ 没有可合并的xlsx文件")
+            return None
+        print(f"📊 已流式合并 {len(summary['merged'])} 个文件，共 {summary['rows']} 行：{summary['path']}")
+        record_snapshot("douyin", summary["path"])
+        if merged_excel_export:
+            # Excel 需要完整的表，另存时会整体读入内存
+            final_file = os.path.join(os.path.dirname(store_path), "douyin_汇总数据.xlsx")
+            read_store(summary["path"]).to_excel(final_file, index=False)
+            print(f"📊 已成功导出汇总文件：{final_file}")
+        cls.cleanup_temp_files([f for f in summary["merged"] if f in disk_files])
+        return summary["path"]
+
+    @classmethod
+    def merge_parsed(cls, parsed, extra_files=None):
+        """
+        合并到默认的汇总文件（run_all 和队列模式的协调节点共用）
+        """
+        return cls.merge_xlsx_files(str(dy_file_path), parsed=parsed, extra_files=extra_files)
+
+    @classmethod
+    def _run_account(cls, cookie_file, engine=None, journal=None, window=None):
+        print(f"\n================ 当前账号: {cookie_file} ================\n")
+        engine = engine or export_engine
+        limiter = limiter_for("douyin", engine)
+        with limiter.session(), account_driver(engine, account_staging_dir(dy_staging_path, cookie_file)) as driver:
+            douyin = cls("https://creator.douyin.com/creator-micro/home", cookie_file, engine=engine, driver=driver)
+            douyin.journal = journal
+            douyin.export_window = window
+            douyin.run()
+        if douyin.step_failed is None:
+            # 页面步骤失败与导出频率无关，不上报给限速器，避免无故降速
+            limiter.report(ok=bool(douyin.downloaded_file) or douyin.export_buffer is not None, throttled=douyin.throttled)
+        result = {
+            "latency": douyin.download_latency, "login": douyin.login_seconds,
+            "steps": douyin.steps.summary(), "file": douyin.downloaded_file, "frame": None,
+            "step_failed": douyin.step_failed,
+        }
+        if douyin.export_buffer is not None:
+            # 内存捕获的文件没有落盘，用 memory:// 作为合并时的标识
+            result["file"] = f"memory://douyin/{douyin.account}"
+            result["frame"] = cls.read_export(douyin.export_buffer, account=douyin.account)
+        elif douyin.downloaded_file and not merge_streaming:
+            # 下载完成后立即解析，与其他账号的下载并行进行（流式合并时不提前解析，避免所有账号的数据同时留在内存中）
+            try:
+                result["frame"] = cls.read_export(douyin.downloaded_file)
+            except Exception as e:
+                print(f"⚠️ 无法读取 {douyin.downloaded_file}: {e}")
+        return result
+
+    @classmethod
+    def run_all(cls, workers=None, engine=None, resume=True, incremental=None):
+        """
+        处理所有 Douyin 账号
+        :param workers: 并行数量，None 时使用 project_config 中的 max_browser_workers（http 方式为 http_max_workers），1 为串行
+        :param engine: "selenium" 或 "http"，None 时使用 project_config 中的 export_engine
+        :param resume: True 时跳过今天已导出成功的账号（断点续跑）；False 时全部重新导出
+        :param incremental: 是否只导出上次成功以来的时间范围，None 时使用 project_config 中的 incremental_export
+        :return: {cookie 文件路径: 运行结果}，没有可运行的账号时返回 None
+        """
+        engine = engine or export_engine
+        if engine == "http":
+            # 导出接口未配置时直接拒绝运行，不会把所有账号都记为失败
+            require_configured("douyin")
         print("📊 开始运行 run_all()：处理所有 Douyin 账号")
         cookie_paths = get_douyin_cookie_paths()
         print("🧾 Cookie 路径列表：")
@@ -162,15 +436,65 @@ class Douyin:
             print("❌ 未找到任何 cookie 文件，任务终止")
             return
 
-        for cookie_file in cookie_paths:
-            print(f"\n================ 当前账号: {cookie_file} ================\n")
-            douyin = cls("https://creator.douyin.com/creator-micro/home", cookie_file)
-            douyin.run()
-            print("⏳ 等待下载完成...")
-            time.sleep(15)
+        vault = CookieVault()
+        cookie_paths = vault.check(
+            "douyin", cookie_paths, skip_expired=skip_expired_accounts, run_preflight=cookie_preflight
+        )
+        if not cookie_paths:
+            print("❌ 没有登录有效的账号，任务终止")
+            return
+
+        journal = RunJournal("douyin")
+        if resume:
+            done = [p for p in cookie_paths if journal.is_landed(p)]
+            if done:
+                print(f"⏩ 断点续跑：{len(done)} 个账号今天已导出完成，跳过")
+            cookie_paths = journal.pending(cookie_paths)
+        else:
+            journal.reset()
+
+        windows = account_windows(vault, cookie_paths, incremental=incremental)
+        for p in cookie_paths:
+            print(f"📅 导出范围 {os.path.basename(p)}：{' ~ '.join(windows[p]) if windows[p] else '页面默认范围'}")
+
+        workers = resolve_worker_count(workers, jobs=len(cookie_paths), browser=engine != "http")
+        log_dir = None
+        if workers > 1:
+            log_dir = log_path / datetime.now().strftime("%Y%m%d_%H%M%S") / "douyin"
+            print(f"🚀 并行模式（{engine}）：{workers} 个 worker，账号日志目录：{log_dir}")
+
+        results = run_in_pool(
+            cookie_paths,
+            lambda p: run_with_retry(lambda c: cls._run_account(c, engine=engine, journal=journal, window=windows[c]), p, journal),
+            workers=workers, log_dir=log_dir,
+            name_of=lambda p: os.path.splitext(os.path.basename(p))[0]
+        )
+        print("\n⏱️ 各账号用时：")
+        for p, r in results.items():
+            info = r["result"] if r["ok"] else {}
+            login, latency = info.get("login"), info.get("latency")
+            login_str = f"{login:.1f}s" if login is not None else "-"
+            latency_str = f"{latency:.1f}s" if latency is not None else "未下载"
+            steps_str = f"（{info['steps']}）" if info.get("steps") else ""
+            print(f" - {os.path.basename(p)}: 登录 {login_str}，下载 {latency_str}{steps_str}")
+
+        vault.mark_success([p for p, r in results.items() if r["ok"] and r["result"]["file"]])
+
+        failed = failed_accounts(results)
+        if failed:
+            print(f"⚠️ {len(failed)} 个账号处理失败：")
+            for p, reason in failed.items():
+                print(f" - {p}：{reason}")
 
         print("\n📁 准备合并 Excel 文件...")
-        cls.merge_xlsx_files(str(dy_file_path))
+        parsed = {
+            r["result"]["file"]: r["result"]["frame"]
+            for r in results.values()
+            if r["ok"] and r["result"]["frame"] is not None
+        }
+        if cls.merge_parsed(parsed) is not None:
+            journal.mark_merged()
+        return results
 
 if __name__ == "__main__":
     Douyin.run_all()
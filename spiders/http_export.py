@@ -0,0 +1,186 @@
+'''
+HTTP 导出：不启动浏览器，直接用 pkl 中保存的 cookie 请求创作者中心的导出接口，把 xlsx 流式写入磁盘
+'''
+
+import os
+import time
+import pickle
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 自动添加项目根目录到 sys.path
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import http_export_api, http_max_workers, http_timeout
+from utils.rate_limiter import is_throttle_text
+from utils.export_window import default_window
+from utils.export_capture import XLSX_SIGNATURE
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0"
+)
+
+# 所有账号共用同一个连接池；cookie 仍按账号放在各自的 Session 中，互不串号
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def _shared_adapter():
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=http_max_workers,
+                max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504)),
+            )
+        return _adapter
+
+
+def build_session(cookies_file, referer=""):
+    """
+    用 pkl 中的 cookie 构造走共用连接池的 requests.Session
+    """
+    session = requests.Session()
+    adapter = _shared_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Referer": referer,
+        "Accept": "application/octet-stream, application/vnd.openxmlformats-officedocument.spreadsheetml.sheet, */*",
+    })
+    with open(cookies_file, "rb") as cookie_file:
+        cookies = pickle.load(cookie_file)
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"], cookie["value"],
+            domain=cookie.get("domain", ""), path=cookie.get("path", "/")
+        )
+    return session
+
+
+class HttpExportError(Exception):
+    """导出接口返回的不是 xlsx 文件（通常是登录失效、接口变化或被限流）"""
+
+    def __init__(self, message, throttled=False):
+        super().__init__(message)
+        self.throttled = throttled
+
+
+def require_configured(platform):
+    """
+    http 方式需要先在 project_config 的 http_export_api 中填好导出接口，未填写时拒绝运行
+    """
+    if not (http_export_api.get(platform) or {}).get("url"):
+        raise HttpExportError(
+            f"http 导出方式尚未配置：请先在浏览器开发者工具中抓取 {platform} 的导出请求，"
+            f"把 url、params 填入 project_config 的 http_export_api[\"{platform}\"]，或改用 selenium"
+        )
+
+
+class HttpExporter:
+    def __init__(self, platform, cookies_file, download_path):
+        """
+        :param platform: "douyin" 或 "xhs"，对应 project_config 中 http_export_api 的配置
+        :param cookies_file: pkl 格式的 cookie 文件
+        :param download_path: 导出文件保存目录
+        """
+        require_configured(platform)
+        self.platform = platform
+        self.api = http_export_api[platform]
+        self.cookies_file = cookies_file
+        self.download_path = download_path
+        self.session = None
+
+    def load_session(self):
+        self.session = build_session(self.cookies_file, referer=self.api.get("referer", ""))
+        return self.session
+
+    def export(self, filename, window=None):
+        """
+        请求导出接口并把返回的 xlsx 流式写入 download_path/filename
+        :param window: (开始日期, 结束日期)，替换 params 中的 {start_date}、{end_date}；None 时为 export_window.default_window()
+        :return: 保存后的文件路径
+        """
+        if self.session is None:
+            self.load_session()
+        target = os.path.join(str(self.download_path), filename)
+        partial = target + ".partial"
+        params = dict(self.api.get("params") or {})
+        # 没有增量范围时按平台允许的最长范围导出
+        start_date, end_date = window or default_window()
+        params = {
+            k: v.format(start_date=start_date, end_date=end_date) if isinstance(v, str) else v
+            for k, v in params.items()
+        }
+        with self.session.request(
+            self.api.get("method", "GET"), self.api["url"],
+            params=params or None,
+            stream=True, timeout=http_timeout,
+        ) as resp:
+            if resp.status_code == 429:
+                raise HttpExportError("导出接口限流（HTTP 429）", throttled=True)
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type", "")
+            if "json" in content_type or "html" in content_type:
+                raise HttpExportError(
+                    f"导出接口未返回文件（{content_type}）：{resp.text[:200]}",
+                    throttled=is_throttle_text(resp.text)
+                )
+            with open(partial, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    if chunk:
+                        f.write(chunk)
+        self._check_xlsx(partial, content_type)
+        os.replace(partial, target)
+        return target
+
+    @staticmethod
+    def _check_xlsx(path, content_type):
+        """
+        只有非空、以 xlsx 文件头开头的内容才算导出成功（text/plain 错误页、octet-stream 的 JSON、空响应都不算），
+        否则删除临时文件并报错，不会被当作导出成功记录
+        """
+        with open(path, "rb") as f:
+            head = f.read(512)
+        if head.startswith(XLSX_SIGNATURE):
+            return
+        os.remove(path)
+        if not head:
+            raise HttpExportError(f"导出接口返回了空内容（{content_type or '无 Content-Type'}）")
+        text = head.decode("utf-8", errors="replace")
+        raise HttpExportError(
+            f"导出接口返回的不是 xlsx 文件（{content_type or '无 Content-Type'}）：{text[:200]}",
+            throttled=is_throttle_text(text)
+        )
+
+    def close(self):
+        # 不调用 session.close()：它会关闭共用的连接池
+        self.session = None
+
+
+def run_http_export(spider, platform, filename):
+    """
+    用 HTTP 方式完成 spider 的导出，结果写回 spider.downloaded_file / spider.download_latency
+    """
+    exporter = HttpExporter(platform, spider.cookies_file, spider.download_path)
+    start = time.perf_counter()
+    try:
+        file = exporter.export(filename, window=spider.export_window)
+    except FileNotFoundError:
+        print(f"❌ Cookie 文件未找到: {spider.cookies_file}")
+        return None
+    except (requests.RequestException, HttpExportError) as e:
+        spider.throttled = getattr(e, "throttled", False)
+        print(f"❌ HTTP 导出失败：{e}")
+        return None
+    finally:
+        exporter.close()
+    spider.downloaded_file = file
+    spider.download_latency = time.perf_counter() - start
+    print(f"📥 HTTP 导出完成：{os.path.basename(file)}，用时 {spider.download_latency:.2f}s")
+    return file
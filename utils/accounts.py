@@ -0,0 +1,24 @@
+'''
+账号相关的小工具：由 cookie 文件名得到账号名、账号的下载暂存目录
+'''
+
+import os
+from pathlib import Path
+
+
+def account_name_from_cookie(cookies_file):
+    """
+    由 cookie 文件名得到账号名，如 douyin_123456.pkl -> 123456，xhs_abc.pkl -> abc
+    """
+    stem = os.path.splitext(os.path.basename(str(cookies_file)))[0]
+    _, sep, name = stem.partition("_")
+    return name if sep and name else stem
+
+
+def account_staging_dir(staging_root, cookies_file):
+    """
+    返回账号专属的下载暂存目录（不存在时自动创建）
+    """
+    path = Path(staging_root) / account_name_from_cookie(cookies_file)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,163 @@
+'''
+浏览器启动相关：Edge 启动参数（含无头精简模式）、通过 DevTools 协议一次性注入 cookie、按账号保存浏览器配置目录
+'''
+
+import pickle
+from pathlib import Path
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    use_browser_profile, profile_path, browser_mode, lean_window_size, lean_blocked_urls,
+    export_capture, platform_origins
+)
+from utils.export_capture import enable_capture
+
+
+def build_edge_options(download_path, profile_dir=None, mode=None):
+    """
+    构造 Edge 启动参数
+    :param download_path: 下载目录
+    :param profile_dir: 浏览器配置目录，不为 None 时复用该目录中的登录状态
+    :param mode: "normal" 或 "lean"，None 时使用 project_config 中的 browser_mode
+    """
+    mode = mode or browser_mode
+    edge_options = Options()
+    prefs = {
+        "download.default_directory": str(download_path),
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": True
+    }
+    if mode == "lean":
+        # 不加载图片、不弹通知
+        prefs["profile.managed_default_content_settings.images"] = 2
+        prefs["profile.default_content_setting_values.notifications"] = 2
+        width, height = lean_window_size
+        for arg in (
+            "--headless=new",
+            f"--window-size={width},{height}",
+            "--disable-gpu",
+            "--mute-audio",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--blink-settings=imagesEnabled=false",
+        ):
+            edge_options.add_argument(arg)
+        if profile_dir is None:
+            # 临时配置目录用完即删，缓存只写不读，直接关掉省去磁盘写入
+            edge_options.add_argument("--disk-cache-size=1")
+    edge_options.add_experimental_option("prefs", prefs)
+    if profile_dir is not None:
+        edge_options.add_argument(f"--user-data-dir={profile_dir}")
+    if export_capture:
+        # 内存捕获模式需要读取 Network 事件
+        edge_options.set_capability("ms:loggingPrefs", {"performance": "ALL"})
+    return edge_options
+
+
+def prepare_driver(driver, download_path, mode=None):
+    """
+    浏览器启动后的设置：normal 模式最大化窗口；lean 模式屏蔽媒体/字体/统计脚本请求，并允许无头模式下载文件；
+    开启 export_capture 时禁止下载、改为在内存中捕获导出文件
+    """
+    mode = mode or browser_mode
+    if mode != "lean":
+        driver.maximize_window()
+    else:
+        _apply_lean_mode(driver, download_path)
+    if export_capture:
+        enable_capture(driver)
+
+
+def _apply_lean_mode(driver, download_path):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(lean_blocked_urls)})
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+        "behavior": "allow",
+        "downloadPath": str(download_path),
+        "eventsEnabled": False,
+    })
+
+
+def account_profile_dir(platform, account):
+    """
+    返回账号专属的浏览器配置目录，未开启 use_browser_profile 时返回 None
+    """
+    if not use_browser_profile:
+        return None
+    path = Path(profile_path) / f"{platform}_{account}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def to_cdp_cookie(cookie):
+    """
+    把 selenium get_cookies() 保存的 cookie 转成 Network.setCookies 所需的格式
+    """
+    cdp_cookie = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ""),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if "expiry" in cookie:
+        cdp_cookie["expires"] = int(cookie["expiry"])
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        cdp_cookie["sameSite"] = cookie["sameSite"]
+    return cdp_cookie
+
+
+def inject_cookies_cdp(driver, cookies_file):
+    """
+    在空白页上用一次 Network.setCookies 调用写入全部 cookie，不需要先打开目标站点
+    """
+    with open(cookies_file, "rb") as f:
+        cookies = pickle.load(f)
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": [to_cdp_cookie(c) for c in cookies]})
+    return len(cookies)
+
+
+def clear_platform_sessions(driver):
+    """
+    清空浏览器中的全部 cookie，以及各平台站点（platform_origins）的 localStorage、IndexedDB 等存储，
+    上一个账号的登录状态不会残留到下一个账号
+    """
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    for origins in platform_origins.values():
+        for origin in origins:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+def is_on_page(driver, url):
+    """
+    判断当前是否停留在 url（未登录时创作者中心会跳转到登录页）
+    """
+    return driver.current_url.split("?")[0].rstrip("/").startswith(url.rstrip("/"))
+
+
+def login_via_cdp(driver, cookies_file, target_url, profile_dir=None, timeout=30):
+    """
+    用 DevTools 注入 cookie 后直接打开 target_url，只加载一次目标页面
+    :param profile_dir: 账号的浏览器配置目录，已使用过且仍处于登录状态时跳过 cookie 注入
+    :return: "profile"（复用配置目录的登录状态）或 "cdp"（注入了 cookie）
+    """
+    if profile_dir is not None and (Path(profile_dir) / "Default").exists():
+        driver.get(target_url)
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == 'complete'
+        )
+        if is_on_page(driver, target_url):
+            print("♻️ 复用浏览器配置目录中的登录状态，跳过 cookie 注入")
+            return "profile"
+    driver.get("about:blank")
+    # 浏览器池中复用的浏览器、或登录已失效的配置目录里可能留有其他账号的 cookie 和存储，先全部清空
+    clear_platform_sessions(driver)
+    count = inject_cookies_cdp(driver, cookies_file)
+    print(f"🍪 已通过 DevTools 一次性注入 {count} 个 cookie")
+    driver.get(target_url)
+    return "cdp"
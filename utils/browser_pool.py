@@ -0,0 +1,170 @@
+'''
+常驻浏览器池：守护进程模式下 Edge 实例在多个账号、多次定时任务之间复用，省去每个账号冷启动浏览器的时间；
+归还时清空 cookie 和站点存储，使用 browser_max_uses 次后关闭重建，避免长时间运行的内存膨胀
+'''
+
+import queue
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.edge.service import Service
+from selenium.common.exceptions import WebDriverException
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import driver_path, max_total_browsers, browser_max_uses, export_capture
+from utils.browser import build_edge_options, prepare_driver, clear_platform_sessions
+from utils.worker_pool import resolve_worker_count, browser_slot
+
+_active_pool = None
+
+
+def set_active_pool(pool):
+    """
+    设置当前使用的浏览器池，None 表示每个账号单独启动浏览器（默认）
+    """
+    global _active_pool
+    _active_pool = pool
+
+
+def active_pool():
+    return _active_pool
+
+
+@contextmanager
+def account_driver(engine, download_path):
+    """
+    为一个账号取得浏览器：http 方式不需要浏览器；守护进程模式从浏览器池借用常驻浏览器；
+    否则只占用一个浏览器名额，由爬虫实例自行启动
+    :return: 借用的 driver，需要实例自行启动或不需要浏览器时为 None
+    """
+    if engine == "http":
+        yield None
+    elif active_pool() is not None:
+        with browser_slot(), active_pool().lease(download_path) as driver:
+            yield driver
+    else:
+        with browser_slot():
+            yield None
+
+
+def point_downloads(driver, download_path):
+    """
+    把已启动浏览器的下载目录切换到 download_path（内存捕获模式下保持禁止下载）
+    """
+    if export_capture:
+        return
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+        "behavior": "allow",
+        "downloadPath": str(download_path),
+        "eventsEnabled": False,
+    })
+
+
+def clear_session(driver):
+    """
+    清空上一个账号留下的 cookie、当前站点和各平台站点的存储，回到空白页
+    """
+    origin = driver.execute_script("return location.origin")
+    if origin and origin.startswith("http"):
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+    clear_platform_sessions(driver)
+    driver.get("about:blank")
+
+
+class BrowserPool:
+    def __init__(self, size=None, max_uses=browser_max_uses):
+        """
+        :param size: 同时存在的浏览器数量上限，None 时按 max_total_browsers 和可用内存计算
+        :param max_uses: 每个浏览器最多服务多少个账号，之后关闭重建
+        """
+        self.size = size or resolve_worker_count(max_total_browsers)
+        self.max_uses = max_uses
+        # 后进先出：优先使用刚归还的浏览器
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._uses = {}
+        self.stats = {"created": 0, "recycled": 0, "leases": 0}
+
+    def _create(self, download_path):
+        driver = webdriver.Edge(
+            service=Service(str(driver_path)),
+            options=build_edge_options(download_path)
+        )
+        prepare_driver(driver, download_path)
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self.stats["created"] += 1
+        print(f"🌐 浏览器池新建浏览器（共创建 {self.stats['created']} 个）")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def _take_idle(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            try:
+                driver.current_url   # 确认浏览器仍然存活
+                return driver
+            except WebDriverException:
+                self._discard(driver)
+
+    @contextmanager
+    def lease(self, download_path):
+        """
+        借出一个浏览器，下载目录切换到 download_path；使用结束后自动清理并归还
+        """
+        self._slots.acquire()
+        driver = None
+        healthy = True
+        try:
+            driver = self._take_idle() or self._create(download_path)
+            point_downloads(driver, download_path)
+            with self._lock:
+                self.stats["leases"] += 1
+            yield driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if driver is not None:
+                self._give_back(driver, healthy)
+            self._slots.release()
+
+    def _give_back(self, driver, healthy):
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            worn_out = self._uses[id(driver)] >= self.max_uses
+        if healthy and not worn_out:
+            try:
+                clear_session(driver)
+                self._idle.put(driver)
+                return
+            except WebDriverException:
+                pass
+        if worn_out:
+            with self._lock:
+                self.stats["recycled"] += 1
+            print(f"♻️ 浏览器已使用 {self.max_uses} 次，关闭后重建")
+        self._discard(driver)
+
+    def status(self):
+        return {"size": self.size, "idle": self._idle.qsize(), **self.stats}
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,96 @@
+'''
+http 导出方式的端到端检查：启动本地桩服务（utils.stub_export_server），用临时 cookie 走一遍 run_http_export → 读取导出文件，
+并确认接口返回错误页、JSON、空内容、限流或未登录时不会留下文件、也不会被当作导出成功
+
+用法：python -m utils.check_http_export（全部通过时退出码为 0）
+'''
+
+import os
+import sys
+import pickle
+import tempfile
+from types import SimpleNamespace
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import http_export_api
+from spiders.http_export import run_http_export
+from utils.stub_export_server import start_stub_server, AUTH_COOKIES, FAILURE_MODES
+from utils.xlsx_reader import read_export_file
+
+FILENAMES = {"douyin": "data.xlsx", "xhs": "笔记列表明细表.xlsx"}
+
+
+def _spider(directory, cookies_file):
+    # run_http_export 只用到这几个属性
+    return SimpleNamespace(
+        cookies_file=cookies_file, download_path=directory, export_window=("2025-05-01", "2025-05-31"),
+        downloaded_file=None, download_latency=None, throttled=False,
+    )
+
+
+def _cookie_file(directory, platform, logged_in=True):
+    path = os.path.join(directory, f"{platform}_{'ok' if logged_in else 'expired'}.pkl")
+    cookies = [{"name": AUTH_COOKIES[platform], "value": "stub", "domain": "127.0.0.1"}] if logged_in else []
+    with open(path, "wb") as f:
+        pickle.dump(cookies, f)
+    return path
+
+
+def check_platform(platform, base_url, directory):
+    """
+    :return: 失败的检查项列表
+    """
+    failures = []
+    api = http_export_api[platform]
+    original = dict(api)
+    cookies_file = _cookie_file(directory, platform)
+    try:
+        # 正常导出：文件落地，且能按平台格式读取
+        api.update(url=f"{base_url}/{platform}", params={"start": "{start_date}", "end": "{end_date}"})
+        spider = _spider(directory, cookies_file)
+        file = run_http_export(spider, platform, FILENAMES[platform])
+        if not file or spider.downloaded_file != file:
+            failures.append("正常导出未返回文件")
+        elif len(read_export_file(file, platform, account="stub", use_cache=False)) == 0:
+            failures.append("导出文件读取为空")
+        else:
+            os.remove(file)
+
+        # 接口异常、未登录：不落地文件，不记为成功；限流时标记 throttled
+        cases = [(mode, cookies_file, f"{base_url}/{platform}/{mode}") for mode in FAILURE_MODES]
+        cases.append(("未登录", _cookie_file(directory, platform, logged_in=False), f"{base_url}/{platform}"))
+        for name, cookies, url in cases:
+            api["url"] = url
+            spider = _spider(directory, cookies)
+            file = run_http_export(spider, platform, FILENAMES[platform])
+            target = os.path.join(directory, FILENAMES[platform])
+            if file or spider.downloaded_file or os.path.exists(target) or os.path.exists(target + ".partial"):
+                failures.append(f"{name}：被当作导出成功或留下了文件")
+            if name == "throttled" and not spider.throttled:
+                failures.append("throttled：未标记为限流")
+    finally:
+        api.clear()
+        api.update(original)
+    return failures
+
+
+def main():
+    server, base_url = start_stub_server()
+    failed = False
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for platform in ("douyin", "xhs"):
+                failures = check_platform(platform, base_url, directory)
+                failed = failed or bool(failures)
+                if failures:
+                    print(f"❌ {platform}：" + "；".join(failures))
+                else:
+                    print(f"✅ {platform}：正常导出、{len(FAILURE_MODES) + 1} 种异常情况均符合预期")
+    finally:
+        server.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+'''
+内容ID：给每条作品一个稳定的 64 位整数键，今天和之前快照的对齐、补算都按它做索引查找，不再按标题（长文字、可能重复）合并。
+导出文件中有平台作品 ID 时用它的哈希，否则用 账号 + 标题 + 发布时间 的哈希（仍相同的按体裁、出现顺序加序号区分）；
+快照读取时按保存的列重新计算，同一快照中作品 ID 重复的行会被报告并只保留一行
+'''
+
+import numpy as np
+import pandas as pd
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import platform_column_maps, content_id_columns
+
+ID_COLUMN = "内容ID"
+# 派生键相同时用于排序的统一字段（同一作品每天不变的属性；播放量等指标每天变化，不能用来排序）
+TIEBREAK_LABELS = ("体裁",)
+
+
+def _hash(values):
+    # pandas 的哈希使用固定密钥，不同进程、不同日期结果相同
+    return pd.util.hash_array(np.asarray(values, dtype=object)).view(np.int64)
+
+
+def _platform_ids(df, platform):
+    for col in content_id_columns.get(platform, []):
+        if col in df.columns:
+            ids = df[col]
+            if pd.api.types.is_numeric_dtype(ids):
+                ids = ids.astype("Int64")
+            ids = ids.astype(str).str.strip()
+            return ids.where(df[col].notna() & (ids != ""))
+    return None
+
+
+def _datetimes(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors="coerce")
+
+
+def _publish_keys(df, publish_col, precise):
+    if publish_col not in df.columns:
+        return pd.Series("", index=df.index)
+    # 转为整数秒（或天）再转文字，比 strftime 快得多
+    publish = _datetimes(df[publish_col])
+    units = publish.to_numpy(dtype="datetime64[ns]").astype("datetime64[s]" if precise else "datetime64[D]")
+    text = pd.Series(units.astype("int64").astype(str), index=df.index)
+    return text.where(publish.notna(), "")
+
+
+def _has_time(df, platform):
+    # 发布时间是否带有时分秒（旧快照、另存过的 Excel 可能只精确到天）
+    publish_col = platform_column_maps[platform]["发布时间"]
+    if publish_col not in df.columns or df.empty:
+        return True
+    publish = _datetimes(df[publish_col]).dropna()
+    nanos = publish.to_numpy(dtype="datetime64[ns]").astype("int64")
+    return publish.empty or bool((nanos % (24 * 3600 * 10 ** 9)).any())
+
+
+def _rank_duplicates(keys, df, platform):
+    """
+    同一账号同一时间发布的同名作品得到相同的键：加上序号区分为不同作品而不是删除（账号已在键中，同组的行一定属于同一账号）。
+    组内先按 TIEBREAK_LABELS（作品不变的属性，如体裁）排序，仍相同的按导出文件中的顺序；
+    这类作品只能靠导出顺序区分，平台调整导出顺序时它们之间的对应关系可能互换
+    """
+    duplicated = keys.duplicated(keep=False)
+    if not duplicated.any():
+        return keys
+    mapping = platform_column_maps[platform]
+    tiebreak = [mapping[label] for label in TIEBREAK_LABELS if mapping.get(label) in df.columns]
+    group = pd.DataFrame({"key": keys[duplicated]})
+    for col in tiebreak:
+        group[col] = df.loc[duplicated, col].astype(str).to_numpy()
+    group = group.sort_values(["key"] + tiebreak, kind="stable")
+    rank = group.groupby("key", sort=False).cumcount().reindex(keys.index, fill_value=0)
+    return keys.where(rank == 0, keys + "#" + rank.astype(str))
+
+
+def content_ids(df, platform, with_account=True, precise=True):
+    """
+    :param with_account: False 时派生的键不含账号（与没有账号列的旧快照对齐时使用）
+    :param precise: False 时发布时间只取日期（与只精确到天的旧快照对齐时使用）
+    :return: 与 df 行对应的内容ID（int64 Series）
+    """
+    mapping = platform_column_maps[platform]
+    title_col, publish_col = mapping["作品名称"], mapping["发布时间"]
+    if with_account and "账号" in df.columns:
+        account = df["账号"].astype(str)
+    else:
+        account = pd.Series("", index=df.index)
+    title = df[title_col].astype(str) if title_col in df.columns else pd.Series("", index=df.index)
+    keys = "k|" + account + "|" + title + "|" + _publish_keys(df, publish_col, precise)
+    platform_ids = _platform_ids(df, platform)
+    if platform_ids is None:
+        keys = _rank_duplicates(keys, df, platform)
+    else:
+        # 平台作品 ID 相同的就是同一条作品，不加序号
+        derived = platform_ids.isna()
+        keys = keys.where(derived, "id|" + platform_ids)
+        keys[derived] = _rank_duplicates(keys[derived], df[derived], platform)
+    return pd.Series(_hash(keys.to_numpy()), index=df.index, name=ID_COLUMN)
+
+
+def ensure_content_ids(df, platform):
+    """
+    没有内容ID列时（旧版本的合并结果、Excel）补上
+    :return: df（原地修改）
+    """
+    if ID_COLUMN not in df.columns:
+        df[ID_COLUMN] = content_ids(df, platform)
+    return df
+
+
+def comparable_ids(frames, platform):
+    """
+    按所有数据共有的信息重新计算内容ID，保证能互相对齐：只要有一份数据没有账号列（旧版本的快照），键中不含账号；
+    有的数据带时分秒、有的只精确到天时，键中的发布时间只取日期。两者都不需要时保持原样
+    :return: frames（原地修改）
+    """
+    with_account = all("账号" in df.columns for df in frames)
+    has_time = [_has_time(df, platform) for df in frames]
+    # 全部都只精确到天时键本来就一致，不需要重新计算
+    precise = all(has_time) or not any(has_time)
+    if with_account and precise:
+        return frames
+    if not with_account:
+        print(f"⚠️ {platform} 有旧版本的快照没有账号列，本次按 标题+发布时间 对齐")
+    if not precise:
+        print(f"⚠️ {platform} 有快照的发布时间只精确到天，本次按发布日期对齐")
+    for df in frames:
+        df[ID_COLUMN] = content_ids(df, platform, with_account=with_account, precise=precise)
+    return frames
+
+
+def dedupe_ids(df, platform, label=""):
+    """
+    检查内容ID是否重复：派生的键已按出现顺序区分，重复只会来自平台作品 ID 相同的行（同一条作品出现了多次，
+    如同一账号的导出被合并了两次），打印数量和示例标题后只保留最后一行，避免对齐时行数成倍增加
+    :param label: 提示中显示的数据来源（如快照日期）
+    """
+    duplicated = df[ID_COLUMN].duplicated(keep="last")
+    if duplicated.any():
+        title_col = platform_column_maps[platform]["作品名称"]
+        examples = df.loc[duplicated, title_col].astype(str).unique()[:5] if title_col in df.columns else []
+        print(f"⚠️ {platform} {label} 有 {int(duplicated.sum())} 行是同一作品ID的重复行（已只保留一行）：{', '.join(examples)}")
+        df = df[~duplicated]
+    return df
+
+
+def align_previous(current, previous, columns):
+    """
+    以内容ID为索引（哈希查找）取出 current 每一行在 previous 中的数值，previous 中没有的为空
+    :param previous: 已经过 dedupe_ids 的数据
+    :return: 与 current 行顺序、索引相同的 DataFrame
+    """
+    indexed = previous.set_index(ID_COLUMN)[columns]
+    return indexed.reindex(current[ID_COLUMN].to_numpy()).set_axis(current.index)
@@ -0,0 +1,154 @@
+'''
+Cookie 索引：记录每个账号 cookie 的过期时间、最近一次成功运行时间和所属平台，
+在启动浏览器前筛掉已过期的账号，避免在登录失效的账号上白白等待导出按钮超时
+'''
+
+import os
+import json
+import time
+import pickle
+import threading
+from datetime import datetime
+
+import requests
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    pkl_path, cookie_index_path, cookie_expiry_margin, preflight_api, http_timeout
+)
+from utils.accounts import account_name_from_cookie
+
+# 各平台的登录态 cookie，账号过期时间取这些 cookie 中最早的 expiry
+AUTH_COOKIE_NAMES = {
+    "douyin": ("sessionid", "sessionid_ss", "sid_tt", "sid_guard", "uid_tt"),
+    "xhs": ("web_session", "galaxy_creator_session_id", "customer-sso-sid",
+            "access-token-creator.xiaohongshu.com"),
+}
+
+
+def auth_expiry(cookies, platform):
+    """
+    返回登录态 cookie 中最早的过期时间戳，都是会话 cookie（没有 expiry）时返回 None
+    """
+    names = AUTH_COOKIE_NAMES.get(platform, ())
+    expiries = [int(c["expiry"]) for c in cookies if c.get("name") in names and "expiry" in c]
+    return min(expiries) if expiries else None
+
+
+def preflight(platform, cookies_file):
+    """
+    用一次轻量 HTTP 请求检查 cookie 是否仍处于登录状态
+    :return: True 已登录 / False 已失效
+    """
+    # 延迟导入，避免 spiders 与 utils 循环引用
+    from spiders.http_export import build_session
+
+    try:
+        session = build_session(cookies_file)
+        resp = session.get(preflight_api[platform], timeout=http_timeout, allow_redirects=False)
+    except (OSError, requests.RequestException) as e:
+        print(f"⚠️ 登录检查请求失败：{e}")
+        return False
+    if resp.status_code != 200:
+        return False
+    try:
+        data = resp.json()
+    except ValueError:
+        return False
+    for key in ("status_code", "code"):
+        if key in data and data[key] != 0:
+            return False
+    return data.get("success", True) is not False
+
+
+class CookieVault:
+    def __init__(self, index_path=cookie_index_path):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Cookie 索引读取失败，将重新建立：{e}")
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(str(self.index_path)), exist_ok=True)
+            tmp = f"{self.index_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.index_path)
+
+    def refresh(self, platform):
+        """
+        扫描 pkl_path 下该平台的 cookie 文件，只重新解析有变化（修改时间不同）的文件
+        :return: 该平台全部 cookie 文件路径
+        """
+        paths = [str(p.resolve()) for p in pkl_path.glob(f"{platform}_*.pkl")]
+        with self._lock:
+            for path in paths:
+                mtime = os.path.getmtime(path)
+                entry = self.entries.get(path)
+                if entry and entry.get("mtime") == mtime:
+                    continue
+                try:
+                    with open(path, "rb") as f:
+                        cookies = pickle.load(f)
+                    expiry = auth_expiry(cookies, platform)
+                except Exception as e:
+                    print(f"⚠️ 无法读取 cookie 文件 {path}: {e}")
+                    expiry = 0
+                self.entries[path] = {
+                    "platform": platform,
+                    "account": account_name_from_cookie(path),
+                    "expiry": expiry,
+                    "mtime": mtime,
+                    "last_success": (entry or {}).get("last_success"),
+                }
+            for path in [p for p, e in self.entries.items() if e.get("platform") == platform and p not in paths]:
+                del self.entries[path]
+        self.save()
+        return paths
+
+    def is_expired(self, path, now=None):
+        entry = self.entries.get(path)
+        if entry is None or entry.get("expiry") is None:
+            return False
+        now = time.time() if now is None else now
+        return entry["expiry"] - cookie_expiry_margin <= now
+
+    def check(self, platform, paths, skip_expired=True, run_preflight=False):
+        """
+        启动浏览器前的检查：过期（以及预检失败）的账号被跳过或仅提示
+        :return: 需要运行的 cookie 文件路径列表
+        """
+        self.refresh(platform)
+        live, dead = [], []
+        for path in paths:
+            expired = self.is_expired(path)
+            if not expired and run_preflight and not preflight(platform, path):
+                expired = True
+            (dead if expired else live).append(path)
+
+        for path in dead:
+            expiry = self.entries.get(path, {}).get("expiry")
+            expiry_str = datetime.fromtimestamp(expiry).strftime("%Y-%m-%d %H:%M") if expiry else "未知"
+            print(f"⛔ 账号登录已失效（过期时间 {expiry_str}），请重新扫码：{path}")
+        if dead and not skip_expired:
+            print("⚠️ skip_expired_accounts=False，失效账号仍会运行")
+            return list(paths)
+        return live
+
+    def mark_success(self, paths):
+        """
+        记录这些账号本次导出成功的时间
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            for path in paths:
+                entry = self.entries.setdefault(path, {"account": account_name_from_cookie(path)})
+                entry["last_success"] = now
+        self.save()
@@ -0,0 +1,202 @@
+'''
+定时任务守护进程：按 daemon_schedules 的时间表把各平台任务放入队列，后台线程依次执行；
+进程常驻，模块导入和浏览器（见 utils.browser_pool）都只初始化一次。
+运行状态（队列长度、正在运行的任务、每个任务的用时）写入 daemon_status_path，可选提供本地 HTTP 状态接口
+'''
+
+import os
+import json
+import time
+import queue
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    daemon_schedules, daemon_poll_interval, daemon_status_path, daemon_status_port
+)
+from utils.rate_limiter import limiter_status
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def next_run_time(times, after):
+    """
+    :param times: ["HH:MM", ...]
+    :return: after 之后最近的一次运行时间
+    """
+    candidates = []
+    for day in (after.date(), after.date() + timedelta(days=1)):
+        for t in times:
+            hour, minute = (int(x) for x in t.split(":"))
+            run_at = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+            if run_at > after:
+                candidates.append(run_at)
+    return min(candidates)
+
+
+class SchedulerDaemon:
+    def __init__(self, jobs, schedules=None, status_path=daemon_status_path, workers=None, pool=None):
+        """
+        :param jobs: {任务名: 可调用对象}，返回 main.run_platform 格式的结果字典
+        :param schedules: {任务名: ["HH:MM", ...]}，None 时使用 project_config 中的 daemon_schedules
+        :param workers: 同时执行的任务数，None 时等于任务数（各平台可同时运行）
+        :param pool: 浏览器池，仅用于在状态中展示
+        """
+        schedules = schedules or daemon_schedules
+        self.jobs = jobs
+        self.status_path = status_path
+        self.workers = workers or len(jobs)
+        self.pool = pool
+        self.queue = queue.Queue()
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        now = datetime.now()
+        self.state = {
+            name: {
+                "schedule": list(schedules.get(name, [])),
+                "next_run": next_run_time(schedules[name], now) if schedules.get(name) else None,
+                "status": "idle",          # idle / queued / running
+                "runs": 0,
+                "failures": 0,
+                "last_start": None,
+                "last_seconds": None,
+                "avg_seconds": None,
+                "last_ok": None,
+                "last_error": None,
+                "recent_seconds": [],
+            }
+            for name in jobs
+        }
+
+    def enqueue(self, name, reason="定时"):
+        with self._lock:
+            job = self.state[name]
+            if job["status"] != "idle":
+                print(f"⏭️ {name} 上一次仍在{'排队' if job['status'] == 'queued' else '运行'}，跳过本次{reason}任务")
+                return False
+            job["status"] = "queued"
+        self.queue.put(name)
+        print(f"🗓️ {name} 已加入队列（{reason}）")
+        return True
+
+    def _tick(self, now):
+        for name, job in self.state.items():
+            if job["next_run"] is not None and now >= job["next_run"]:
+                job["next_run"] = next_run_time(job["schedule"], now)
+                self.enqueue(name)
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                name = self.queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            job = self.state[name]
+            with self._lock:
+                job["status"] = "running"
+                job["last_start"] = datetime.now()
+            self.write_status()
+            start = time.perf_counter()
+            try:
+                summary = self.jobs[name]() or {}
+                ok, error = summary.get("ok", True), summary.get("error")
+            except Exception as e:
+                ok, error = False, e
+            seconds = time.perf_counter() - start
+            with self._lock:
+                job["status"] = "idle"
+                job["runs"] += 1
+                job["failures"] += 0 if ok else 1
+                job["last_ok"] = ok
+                job["last_error"] = str(error) if error else None
+                job["last_seconds"] = round(seconds, 1)
+                job["recent_seconds"] = (job["recent_seconds"] + [round(seconds, 1)])[-10:]
+                job["avg_seconds"] = round(sum(job["recent_seconds"]) / len(job["recent_seconds"]), 1)
+            print(f"{'✅' if ok else '❌'} {name} 定时任务结束，用时 {seconds:.1f}s")
+            self.write_status()
+
+    def status(self):
+        with self._lock:
+            jobs = {}
+            for name, job in self.state.items():
+                jobs[name] = {
+                    k: v.strftime(TIME_FORMAT) if isinstance(v, datetime) else v
+                    for k, v in job.items()
+                }
+            return {
+                "updated_at": datetime.now().strftime(TIME_FORMAT),
+                "started_at": self.started_at.strftime(TIME_FORMAT),
+                "queue_depth": self.queue.qsize(),
+                "running": [name for name, job in self.state.items() if job["status"] == "running"],
+                "jobs": jobs,
+                "browser_pool": self.pool.status() if self.pool is not None else None,
+                "rate_limits": limiter_status(),
+            }
+
+    def write_status(self):
+        data = self.status()
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(str(self.status_path)), exist_ok=True)
+                tmp = f"{self.status_path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.status_path)
+            except OSError as e:
+                print(f"⚠️ 状态文件写入失败：{e}")
+
+    def serve_status(self, port):
+        """
+        在 127.0.0.1:port 提供只读状态接口，返回与状态文件相同的 JSON
+        """
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(daemon.status(), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), StatusHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📡 状态接口：http://127.0.0.1:{server.server_address[1]}/")
+        return server
+
+    def run_forever(self, run_now=False, status_port=daemon_status_port, poll_interval=daemon_poll_interval):
+        """
+        :param run_now: 启动后立即运行一次所有任务，再按时间表运行
+        """
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        server = self.serve_status(status_port) if status_port is not None else None
+        for name, job in self.state.items():
+            if run_now:
+                self.enqueue(name, reason="启动")
+            if job["next_run"] is not None:
+                print(f"🗓️ {name} 下次运行：{job['next_run'].strftime(TIME_FORMAT)}")
+        try:
+            while True:
+                self._tick(datetime.now())
+                self.write_status()
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print("🛑 守护进程停止，等待正在运行的任务结束")
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+            if server is not None:
+                server.shutdown()
+            self.write_status()
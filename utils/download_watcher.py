@@ -0,0 +1,78 @@
+'''
+下载监控：点击“导出数据”后轮询下载目录，文件写完即返回，替代固定的 time.sleep
+'''
+
+import os
+import time
+import glob
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import download_timeout
+
+# 浏览器下载过程中的临时文件后缀
+PARTIAL_SUFFIXES = (".crdownload", ".partial", ".tmp", ".download")
+
+
+def snapshot_files(directory, pattern="*.xlsx"):
+    """
+    记录目录中已有的文件及其修改时间，用于区分点击导出之后新下载的文件
+    """
+    snapshot = {}
+    for file in glob.glob(os.path.join(str(directory), pattern)):
+        try:
+            snapshot[file] = os.path.getmtime(file)
+        except OSError:
+            continue
+    return snapshot
+
+
+def _has_partial_files(directory):
+    try:
+        names = os.listdir(str(directory))
+    except FileNotFoundError:
+        return False
+    return any(name.endswith(PARTIAL_SUFFIXES) for name in names)
+
+
+def wait_for_download_file(directory, pattern="*.xlsx", before=None, timeout=None,
+                           stable_seconds=1.0, poll_interval=0.5):
+    """
+    等待 directory 中出现新的、已写完的下载文件
+    :param directory: 下载目录
+    :param pattern: 目标文件的 glob 匹配规则
+    :param before: 点击导出前 snapshot_files() 的结果，其中未变化的文件会被忽略
+    :param timeout: 超时时间（秒），None 时使用 project_config 中的 download_timeout
+    :param stable_seconds: 文件大小保持不变多久视为下载完成
+    :param poll_interval: 轮询间隔（秒）
+    :return: 下载完成的文件路径，超时返回 None
+    """
+    before = before or {}
+    timeout = download_timeout if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    sizes = {}
+
+    while time.monotonic() < deadline:
+        candidates = []
+        for file, mtime in snapshot_files(directory, pattern).items():
+            if before.get(file) == mtime:
+                continue
+            candidates.append((mtime, file))
+
+        if candidates and not _has_partial_files(directory):
+            # 取最新的文件，确认大小在 stable_seconds 内没有变化
+            _, file = max(candidates)
+            try:
+                size = os.path.getsize(file)
+            except OSError:
+                size = -1
+            last_size, since = sizes.get(file, (None, None))
+            now = time.monotonic()
+            if size > 0 and size == last_size:
+                if now - since >= stable_seconds:
+                    return file
+            else:
+                sizes[file] = (size, now)
+
+        time.sleep(poll_interval)
+    return None
@@ -0,0 +1,97 @@
+'''
+导出响应捕获：通过 DevTools Network 域直接拿到“导出数据”接口返回的 xlsx 字节，
+不落盘、不猜文件名，直接交给合并流程（需要导出走 XHR/fetch 请求，浏览器下载被禁止）
+'''
+
+import json
+import time
+import base64
+from datetime import datetime
+from pathlib import Path
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import download_timeout, archive_path
+
+# 可能是导出文件的响应 Content-Type 关键字（octet-stream 等二进制响应还要检查内容是否为 xlsx）
+EXPORT_MIME_KEYWORDS = ("spreadsheetml", "ms-excel", "octet-stream")
+# xlsx（zip）文件头
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+
+def enable_capture(driver):
+    """
+    打开 Network 事件记录，并禁止浏览器把文件下载到磁盘
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "deny"})
+
+
+def reset_capture(driver):
+    """
+    丢弃点击导出之前积累的 Network 事件，避免把页面上其他二进制响应误认为导出文件
+    """
+    driver.get_log("performance")
+
+
+def _export_candidate(response):
+    """
+    :return: None 表示不是导出文件；True 表示响应头声明了 .xlsx 附件；False 表示只是表格或二进制类型，需要检查内容的文件头
+    """
+    mime = (response.get("mimeType") or "").lower()
+    headers = {k.lower(): v for k, v in (response.get("headers") or {}).items()}
+    if ".xlsx" in headers.get("content-disposition", "").lower():
+        return True
+    if any(k in mime for k in EXPORT_MIME_KEYWORDS):
+        return False
+    return None
+
+
+def _response_body(driver, request_id):
+    body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    if body.get("base64Encoded"):
+        return base64.b64decode(body["body"])
+    return body["body"].encode("utf-8")
+
+
+def capture_export_response(driver, timeout=None, poll_interval=0.3):
+    """
+    从 performance 日志中找到导出文件的响应，等其加载完成后用 Network.getResponseBody 取出内容。
+    只接受声明了 .xlsx 附件、或内容以 xlsx 文件头开头的响应，页面上其他二进制请求会被跳过
+    :return: xlsx 字节，超时返回 None
+    """
+    timeout = download_timeout if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    candidates = {}     # requestId -> 是否已由 Content-Disposition 确认为 xlsx
+    finished = set()
+
+    while time.monotonic() < deadline:
+        for entry in driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.responseReceived":
+                confirmed = _export_candidate(params.get("response", {}))
+                if confirmed is not None:
+                    candidates[params["requestId"]] = confirmed
+            elif method == "Network.loadingFinished":
+                finished.add(params.get("requestId"))
+
+        for request_id in [r for r in candidates if r in finished]:
+            confirmed = candidates.pop(request_id)
+            data = _response_body(driver, request_id)
+            if confirmed or data.startswith(XLSX_SIGNATURE):
+                return data
+            print(f"⚠️ 跳过不是 xlsx 的二进制响应（{len(data)} 字节）")
+        time.sleep(poll_interval)
+    return None
+
+
+def archive_export(data, platform, account):
+    """
+    归档原始导出文件：archive_path/<日期>/<平台>/<账号>.xlsx
+    """
+    target_dir = Path(archive_path) / datetime.now().strftime("%Y-%m-%d") / platform
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / f"{account}.xlsx"
+    target.write_bytes(data)
+    return target
@@ -0,0 +1,57 @@
+'''
+导出的时间范围（按作品发布时间）：默认不设置，按页面默认范围导出；开启 incremental_export 后
+只导出账号上次导出成功以来仍可能变化的作品，导出文件大小随新作品增长而不是随账号年龄增长（更早作品的增长不再统计）。
+范围不超过平台日期选择器允许的 export_max_days 天，早于 min_publish_date 的作品永远不导出
+'''
+
+from datetime import datetime, timedelta
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    min_publish_date, incremental_export, incremental_lookback_days, export_max_days
+)
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def min_publish_datetime():
+    return datetime.strptime(min_publish_date, DATE_FORMAT)
+
+
+def default_window(now=None):
+    """
+    平台允许的最长范围：max(今天 − export_max_days 天, min_publish_date) 到今天（http 方式没有设置范围时使用）
+    :return: (开始日期, 结束日期)，格式 YYYY-MM-DD
+    """
+    now = now or datetime.now()
+    end = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = min(max(end - timedelta(days=export_max_days), min_publish_datetime()), end)
+    return start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)
+
+
+def export_window(last_success=None, now=None, incremental=None):
+    """
+    :param last_success: 账号上次导出成功的时间（CookieVault 中的 last_success，"YYYY-MM-DD HH:MM:SS"），None 表示没有成功记录
+    :param incremental: None 时使用 project_config 中的 incremental_export
+    :return: (开始日期, 结束日期)，格式 YYYY-MM-DD，结束日期为今天；不是增量导出时返回 None（不修改页面上的日期范围）
+    """
+    incremental = incremental_export if incremental is None else incremental
+    if not incremental:
+        return None
+    start, end = default_window(now)
+    if last_success:
+        last = datetime.strptime(last_success[:10], DATE_FORMAT) - timedelta(days=incremental_lookback_days)
+        start = min(max(start, last.strftime(DATE_FORMAT)), end)
+    return start, end
+
+
+def account_windows(vault, paths, incremental=None):
+    """
+    :return: {cookie 文件路径: (开始日期, 结束日期) 或 None}
+    """
+    windows = {}
+    for path in paths:
+        last_success = vault.entries.get(path, {}).get("last_success")
+        windows[path] = export_window(last_success, incremental=incremental)
+    return windows
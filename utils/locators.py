@@ -0,0 +1,148 @@
+'''
+页面元素定位：每个步骤配置多个定位方式（CSS 优先，XPath 兜底），短间隔轮询，
+记住上次成功的定位方式，找不到时抛出 StepFailed 让流程立即终止，并记录每个步骤的用时
+'''
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver import ActionChains
+from selenium.common.exceptions import WebDriverException
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import step_timeout, locator_cache_path
+
+_cache_lock = threading.Lock()
+_strategy_cache = None
+
+
+class StepFailed(Exception):
+    """流程中的关键步骤失败，后续步骤不再执行"""
+
+
+def _load_cache():
+    global _strategy_cache
+    if _strategy_cache is None:
+        _strategy_cache = {}
+        if os.path.exists(locator_cache_path):
+            try:
+                with open(locator_cache_path, "r", encoding="utf-8") as f:
+                    _strategy_cache = json.load(f)
+            except (OSError, ValueError):
+                pass
+    return _strategy_cache
+
+
+def _remember(name, index):
+    with _cache_lock:
+        cache = _load_cache()
+        if cache.get(name) == index:
+            return
+        cache[name] = index
+        try:
+            os.makedirs(os.path.dirname(str(locator_cache_path)), exist_ok=True)
+            with open(locator_cache_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+        except OSError:
+            pass
+
+
+def _try_strategy(driver, strategy, visible):
+    """
+    按单个定位方式查找元素，strategy 为 (By, 表达式) 或 (By, 表达式, 需要包含的文字)
+    """
+    by, value = strategy[0], strategy[1]
+    text = strategy[2] if len(strategy) > 2 else None
+    if by == By.CSS_SELECTOR and text:
+        # 一次脚本调用完成 CSS + 文字过滤，避免逐个元素读取 text 的往返开销
+        element = driver.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]))"
+            ".find(e => e.textContent.trim().includes(arguments[1])) || null;",
+            value, text
+        )
+        candidates = [element] if element is not None else []
+    else:
+        candidates = driver.find_elements(by, value)
+        if text:
+            candidates = [e for e in candidates if text in e.text]
+    for element in candidates:
+        if not visible or element.is_displayed():
+            return element
+    return None
+
+
+def find_element(driver, name, strategies, timeout=None, poll_interval=0.2, visible=False):
+    """
+    依次尝试 strategies 中的定位方式，上次成功的方式优先
+    :param name: 步骤名称，同时作为定位方式缓存的键
+    :param strategies: [(By, 表达式[, 文字]), ...]，按优先级排列
+    :param visible: 是否要求元素可见
+    :return: 找到的元素，超时抛出 StepFailed
+    """
+    timeout = step_timeout if timeout is None else timeout
+    cached = _load_cache().get(name)
+    order = list(range(len(strategies)))
+    if cached is not None and cached < len(strategies):
+        order.remove(cached)
+        order.insert(0, cached)
+
+    deadline = time.monotonic() + timeout
+    while True:
+        for index in order:
+            try:
+                element = _try_strategy(driver, strategies[index], visible)
+            except WebDriverException:
+                element = None
+            if element is not None:
+                _remember(name, index)
+                return element
+        if time.monotonic() >= deadline:
+            raise StepFailed(f"{timeout}s 内未找到“{name}”（已尝试 {len(strategies)} 种定位方式）")
+        time.sleep(poll_interval)
+
+
+def type_date(driver, element, value, name, timeout=3):
+    """
+    用键盘在日期输入框中输入 value（日期组件不响应直接修改 value），并确认组件接受了该值
+    :param name: 步骤名称（用于提示）
+    :raise StepFailed: 输入框最终显示的不是 value（组件拒绝了该日期，如超出允许的范围）
+    """
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+    driver.execute_script("arguments[0].removeAttribute('readonly')", element)
+    actions = ActionChains(driver)
+    actions.move_to_element(element).click().pause(0.3)
+    actions.key_down(Keys.CONTROL).send_keys('a').key_up(Keys.CONTROL)
+    actions.send_keys(Keys.BACKSPACE).send_keys(value).send_keys(Keys.ENTER).perform()
+    deadline = time.monotonic() + timeout
+    while True:
+        shown = (element.get_attribute("value") or "").strip()
+        if shown.startswith(value):
+            return
+        if time.monotonic() >= deadline:
+            raise StepFailed(f"“{name}”未接受日期 {value}（当前显示“{shown}”）")
+        time.sleep(0.2)
+
+
+class StepTimer:
+    """
+    记录流程中每个步骤的用时
+    """
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def summary(self):
+        return "，".join(f"{name} {seconds:.1f}s" for name, seconds in self.timings.items())
@@ -0,0 +1,73 @@
+'''
+合并结果存储：合并后的数据保存为带类型的 Arrow IPC（Feather v2，不压缩）文件，分析阶段以内存映射方式直接读取，
+日期列保持 datetime64，不再经过 to_excel / read_excel 的来回转换；
+未安装 pyarrow 时退回 pandas pickle（同样保留类型，只是不能内存映射）
+'''
+
+import os
+import importlib.util
+
+import pandas as pd
+
+from utils.init_path import setup_project_root
+setup_project_root()
+
+ARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _fallback_path(path):
+    return os.path.splitext(str(path))[0] + ".pkl"
+
+
+def _arrow_safe(df):
+    """
+    Arrow 每列只能有一种类型：混有数字和文字的列（如“完播率”同时有 0.35 和 "35%"）统一转成文字
+    """
+    df = df.reset_index(drop=True)
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) in ("mixed", "mixed-integer"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def storable(df):
+    """
+    :return: 写入后再读取时得到的数据形式（类型一致），缓存未命中时返回它，与命中时的结果相同
+    """
+    return _arrow_safe(df) if ARROW else df
+
+
+def write_store(df, path):
+    """
+    写入合并结果（先写临时文件再替换，读取方不会读到写了一半的文件）
+    :return: 实际写入的路径（未安装 pyarrow 时为同名 .pkl）
+    """
+    target = str(path) if ARROW else _fallback_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.tmp"
+    if ARROW:
+        _arrow_safe(df).to_feather(tmp, compression="uncompressed")
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, target)
+    return target
+
+
+def store_exists(path):
+    return os.path.exists(str(path)) or os.path.exists(_fallback_path(path))
+
+
+def read_store(path, columns=None):
+    """
+    读取合并结果，Arrow 文件以内存映射方式打开
+    :param columns: 只读取这些列，None 为全部
+    """
+    if ARROW and os.path.exists(str(path)):
+        from pyarrow import feather
+        return feather.read_table(str(path), columns=columns, memory_map=True).to_pandas()
+    fallback = _fallback_path(path)
+    if os.path.exists(fallback):
+        df = pd.read_pickle(fallback)
+        return df[columns] if columns else df
+    raise FileNotFoundError(f"合并结果不存在：{path}")
+
@@ -0,0 +1,127 @@
+'''
+解析结果缓存：以文件内容哈希为键，保存解析后带类型的 DataFrame（与合并结果相同的列式格式）。
+合并失败后重跑、或反复调试分析代码时，内容没变的 xlsx 不再重新解析；
+缓存总大小超过 parse_cache_max_mb 时按最近使用时间删除最旧的条目（LRU）
+'''
+
+import io
+import os
+import glob
+import hashlib
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import parse_cache_path, parse_cache_max_mb
+from utils.merged_store import read_store, write_store, storable, store_exists
+
+# 解析规则变化（列、类型转换）时加 1，旧缓存自动失效
+CACHE_VERSION = 2
+
+
+def content_hash(file):
+    """
+    :param file: 文件路径或 BytesIO
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(file, io.BytesIO):
+        digest.update(file.getbuffer())
+        return digest.hexdigest()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, path=parse_cache_path, max_mb=parse_cache_max_mb):
+        self.path = str(path)
+        self.max_bytes = int((max_mb or 0) * 1024 * 1024)
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _entry(self, file, tag):
+        key = hashlib.blake2b(f"{CACHE_VERSION}|{tag}|{content_hash(file)}".encode(), digest_size=20).hexdigest()
+        return os.path.join(self.path, f"{key}.arrow")
+
+    def get_or_parse(self, file, tag, parse):
+        """
+        命中时直接读取缓存，否则调用 parse(file) 解析并写入缓存
+        :param tag: 解析方式的标识（平台、列、跳过行数等），同一文件不同解析方式分开缓存
+        :return: DataFrame
+        """
+        if not self.enabled:
+            return parse(file)
+        entry = self._entry(file, tag)
+        if store_exists(entry):
+            try:
+                df = read_store(entry)
+                self._touch(entry)
+                return df
+            except Exception as e:
+                print(f"⚠️ 缓存读取失败，重新解析：{e}")
+        if isinstance(file, io.BytesIO):
+            file.seek(0)
+        df = storable(parse(file))
+        try:
+            write_store(df, entry)
+            self.evict()
+        except OSError as e:
+            print(f"⚠️ 无法写入解析缓存：{e}")
+        return df
+
+    def _entries(self):
+        return glob.glob(os.path.join(self.path, "*.arrow")) + glob.glob(os.path.join(self.path, "*.pkl"))
+
+    @staticmethod
+    def _touch(entry):
+        for path in (entry, os.path.splitext(entry)[0] + ".pkl"):
+            try:
+                os.utime(path)
+                return
+            except FileNotFoundError:
+                continue
+
+    def evict(self):
+        """
+        总大小超过上限时，按最近使用时间（修改时间，命中时会更新）从旧到新删除
+        :return: 删除的条目数
+        """
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # 其他进程刚删除
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def clear(self):
+        for path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
@@ -0,0 +1,233 @@
+'''
+队列模式：协调节点把各平台的账号放入共享任务队列，任意多个 worker（本机多进程或其他机器）租用任务完成导出，
+导出文件回传到 queue_results_path/<平台>/<日期>/<账号>/<worker>/，全部任务结束后由协调节点统一合并。
+账号越多只需要增加 worker，不需要延长单台机器的运行时间
+'''
+
+import os
+import time
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    pkl_path, queue_results_path, queue_idle_exit, queue_merge_timeout, export_engine,
+    skip_expired_accounts, cookie_preflight, merge_streaming
+)
+from utils.accounts import account_name_from_cookie
+from utils.cookie_vault import CookieVault
+from utils.export_window import account_windows
+from utils.worker_pool import resolve_worker_count
+from utils.work_queue import SqliteWorkQueue, Heartbeat, default_worker_id
+from utils.xlsx_reader import read_export_files
+from utils.merged_store import ARROW
+
+
+def enqueue_accounts(queue, platform, run_date, incremental=None, reset=False):
+    """
+    把平台下登录有效的账号放入队列，导出时间范围由协调节点按账号上次成功的时间计算
+    :return: 新加入的任务数
+    """
+    vault = CookieVault()
+    paths = vault.check(platform, vault.refresh(platform), skip_expired=skip_expired_accounts, run_preflight=cookie_preflight)
+    if reset:
+        queue.reset(platform, run_date)
+    windows = account_windows(vault, paths, incremental=incremental)
+    added = sum(queue.enqueue(platform, run_date, os.path.basename(p), window=windows[p]) for p in paths)
+    print(f"🗂️ {platform}：{len(paths)} 个账号，新加入队列 {added} 个")
+    return added
+
+
+def _store_result(job, result, worker):
+    """
+    把导出结果回传到共享目录：落盘的文件移动过去，内存捕获的结果保存为 pickle。
+    按 worker 分目录保存，租约丢失的 worker 删除自己的结果时不会误删接手者的文件
+    :return: 回传后的路径
+    """
+    account = account_name_from_cookie(job["cookie_name"])
+    target_dir = Path(queue_results_path) / job["platform"] / job["run_date"] / account / worker
+    target_dir.mkdir(parents=True, exist_ok=True)
+    if str(result["file"]).startswith("memory://"):
+        target = target_dir / "memory_capture.pkl"
+        result["frame"].to_pickle(target)
+    else:
+        target = target_dir / os.path.basename(result["file"])
+        shutil.move(result["file"], target)
+    return str(target)
+
+
+def _discard(path):
+    """
+    删除作废的导出文件（租约丢失的任务结果不会被合并，留着只会占用磁盘、混入下次合并）
+    """
+    if path and not str(path).startswith("memory://") and os.path.exists(path):
+        os.remove(path)
+        print(f"🗑️ 已删除作废的导出文件：{path}")
+
+
+def process_job(queue, job, worker, platform_classes, engine=None):
+    """
+    执行一条租到的任务，在运行期间持续续租
+    """
+    cls = platform_classes[job["platform"]]
+    cookie_file = str((Path(pkl_path) / job["cookie_name"]).resolve())
+    if not os.path.exists(cookie_file):
+        queue.fail(job["job_id"], worker, f"本机没有 cookie 文件：{job['cookie_name']}")
+        return False
+    window = (job["window_start"], job["window_end"]) if job["window_start"] else None
+    print(f"📌 {worker} 租到任务 {job['job_id']}（第 {job['attempts']} 次）")
+    with Heartbeat(queue, job["job_id"], worker) as heartbeat:
+        try:
+            result = cls._run_account(cookie_file, engine=engine, window=window)
+            error = None if result.get("file") else result.get("step_failed") or "未获取到导出文件"
+        except Exception as e:
+            result, error = None, str(e)
+    if heartbeat.lost:
+        # 任务已交给其他 worker，本次结果作废
+        _discard(result and result.get("file"))
+        return False
+    if error is not None:
+        print(f"❌ 任务 {job['job_id']} 失败：{error}")
+        # 页面步骤确定性失败时直接标记为失败，不再排队重试
+        queue.fail(job["job_id"], worker, error, final=bool(result and result.get("step_failed")))
+        return False
+    stored = _store_result(job, result, worker)
+    if not queue.complete(job["job_id"], worker, stored):
+        # 心跳间隔内租约已过期并被其他 worker 接手
+        print(f"⚠️ 任务 {job['job_id']} 的租约已丢失，本次结果作废")
+        _discard(stored)
+        return False
+    print(f"✅ 任务 {job['job_id']} 完成")
+    return True
+
+
+def _active_jobs(queue, platforms, run_date):
+    return sum(c["pending"] + c["leased"] for c in (queue.counts(p, run_date) for p in platforms))
+
+
+def run_worker(platform_classes, queue=None, threads=None, engine=None, idle_exit=queue_idle_exit,
+               run_date=None, poll_interval=5):
+    """
+    worker：不断租用任务并执行，连续 idle_exit 秒没有任务时退出
+    :param platform_classes: {"douyin": Douyin, "xhs": Xhs}
+    :param threads: 本进程同时执行的任务数，None 时按浏览器内存自动计算
+    :param run_date: 不为 None 时，该日期的任务全部结束（没有等待中或运行中的任务）即退出
+    """
+    queue = queue or SqliteWorkQueue()
+    engine = engine or export_engine
+    if engine == "http":
+        from spiders.http_export import require_configured
+        for platform in platform_classes:
+            require_configured(platform)
+    threads = resolve_worker_count(threads, browser=engine != "http")
+    base_id = default_worker_id()
+    stats = {"done": 0, "failed": 0}
+    stats_lock = threading.Lock()
+
+    def loop(worker):
+        idle_since = time.monotonic()
+        while True:
+            job = queue.lease(worker, platforms=list(platform_classes))
+            if job is None:
+                if run_date is not None and _active_jobs(queue, platform_classes, run_date) == 0:
+                    return
+                if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    return
+                time.sleep(poll_interval)
+                continue
+            ok = process_job(queue, job, worker, platform_classes, engine=engine)
+            with stats_lock:
+                stats["done" if ok else "failed"] += 1
+            idle_since = time.monotonic()
+
+    print(f"👷 worker {base_id} 启动，{threads} 个线程")
+    workers = [threading.Thread(target=loop, args=(f"{base_id}-{i}",)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    print(f"👷 worker {base_id} 退出：完成 {stats['done']} 个任务，失败 {stats['failed']} 个")
+    return stats
+
+
+def wait_for_jobs(queue, platforms, run_date, timeout=queue_merge_timeout, poll_interval=10):
+    """
+    等待这些平台当天的任务全部结束（完成或最终失败）
+    :return: 是否在超时前全部结束
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        active = _active_jobs(queue, platforms, run_date)
+        if active == 0:
+            return True
+        if time.monotonic() >= deadline:
+            print(f"⚠️ 等待超时，仍有 {active} 个任务未结束")
+            return False
+        time.sleep(poll_interval)
+
+
+def merge_results(queue, platform, cls, run_date):
+    """
+    合并 worker 回传的导出文件，成功后删除回传目录并记录账号导出成功的时间
+    :return: 合并后的 DataFrame（流式合并时为合并结果的路径），没有可合并的结果时返回 None
+    """
+    jobs = queue.jobs(platform, run_date)
+    paths = [job["result_path"] for job in jobs if job["status"] == "done" and job["result_path"]]
+    failed = [job["cookie_name"] for job in jobs if job["status"] == "failed"]
+    if failed:
+        print(f"⚠️ {platform} 有 {len(failed)} 个账号最终失败：{', '.join(failed)}")
+    if merge_streaming and ARROW:
+        # 流式合并时由合并函数逐个读取回传的文件
+        merged = cls.merge_parsed({}, extra_files=paths) if paths else None
+    else:
+        parsed, errors = read_export_files([p for p in paths if not p.endswith(".pkl")], platform)
+        for path in [p for p in paths if p.endswith(".pkl")]:
+            try:
+                parsed[path] = pd.read_pickle(path)
+            except Exception as e:
+                errors[path] = e
+        for path, e in errors.items():
+            print(f"⚠️ 无法读取 {path}: {e}")
+        merged = cls.merge_parsed(parsed) if parsed else None
+    if merged is None:
+        print(f"❌ {platform} 没有可合并的导出结果")
+        return None
+    shutil.rmtree(Path(queue_results_path) / platform / run_date, ignore_errors=True)
+    vault = CookieVault()
+    vault.mark_success([
+        str((Path(pkl_path) / job["cookie_name"]).resolve()) for job in jobs if job["status"] == "done"
+    ])
+    return merged
+
+
+def run_coordinator(platform_classes, work=True, engine=None, incremental=None, reset=False, run_date=None):
+    """
+    协调节点：放入任务 →（可选）本机也作为 worker 参与导出 → 等待全部任务结束 → 合并
+    :param work: 本机是否同时执行任务；False 时只负责分发和合并
+    :param reset: 清空当天已有的任务，全部重新导出
+    :return: {平台: {"ok", "accounts", "failed"}}
+    """
+    queue = SqliteWorkQueue()
+    run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+    for platform in platform_classes:
+        enqueue_accounts(queue, platform, run_date, incremental=incremental, reset=reset)
+    if work:
+        # 本机 worker 在当天任务全部结束后退出（等待重试的任务也由它兜底）
+        run_worker(platform_classes, queue=queue, engine=engine, idle_exit=None, run_date=run_date)
+    wait_for_jobs(queue, list(platform_classes), run_date)
+
+    summaries = {}
+    for platform, cls in platform_classes.items():
+        counts = queue.counts(platform, run_date)
+        merged = merge_results(queue, platform, cls, run_date)
+        summaries[platform] = {
+            "ok": merged is not None and counts["failed"] == 0 and counts["pending"] + counts["leased"] == 0,
+            "accounts": sum(counts.values()),
+            "failed": counts["failed"],
+        }
+    return summaries
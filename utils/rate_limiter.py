@@ -0,0 +1,159 @@
+'''
+平台级限速：每个平台一个令牌桶（每分钟导出次数）+ 同时会话数上限，所有账号任务启动前先领令牌；
+检测到限流或导出失败时自动降速，连续成功后逐步恢复到配置的速率
+'''
+
+import time
+import threading
+from contextlib import contextmanager
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    rate_limits, http_rate_limits, rate_limit_min_per_minute, rate_limit_backoff, rate_limit_recover
+)
+
+# 页面或接口返回中出现这些文字时视为被平台限流
+THROTTLE_KEYWORDS = ("操作频繁", "请求过于频繁", "访问过于频繁", "请稍后再试", "稍后重试", "too many requests")
+
+
+def is_throttle_text(text):
+    text = (text or "").lower()
+    return any(k in text for k in THROTTLE_KEYWORDS)
+
+
+def page_throttled(driver):
+    """
+    检查当前页面（提示框、toast）是否出现限流提示
+    """
+    try:
+        return is_throttle_text(driver.execute_script("return document.body ? document.body.innerText : ''"))
+    except Exception:
+        return False
+
+
+class PlatformLimiter:
+    def __init__(self, platform, exports_per_minute, max_sessions):
+        """
+        :param exports_per_minute: 每分钟最多开始多少次导出（令牌补充速度）
+        :param max_sessions: 同时进行的导出会话上限，同时也是令牌桶容量
+        """
+        self.platform = platform
+        self.max_rate = float(exports_per_minute)
+        self.rate = self.max_rate
+        self.max_sessions = max_sessions
+        self.capacity = max(1, min(max_sessions, int(exports_per_minute)))
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._sessions = threading.BoundedSemaphore(max_sessions)
+        self.stats = {"started": 0, "ok": 0, "failed": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate / 60)
+        self._updated = now
+
+    def acquire(self):
+        """
+        领取一个令牌，不够时阻塞等待
+        :return: 等待的秒数
+        """
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    waited = now - start
+                    self.stats["started"] += 1
+                    self.stats["waited_seconds"] += waited
+                    return waited
+                wait = (1 - self.tokens) * 60 / self.rate
+            time.sleep(min(wait, 5))
+
+    @contextmanager
+    def session(self):
+        """
+        占用一个会话名额并领取令牌后再开始导出
+        """
+        self._sessions.acquire()
+        try:
+            waited = self.acquire()
+            if waited >= 1:
+                print(f"🚦 {self.platform} 限速：等待 {waited:.1f}s 后开始导出（当前 {self.rate:.1f} 次/分钟）")
+            yield
+        finally:
+            self._sessions.release()
+
+    def report(self, ok, throttled=False):
+        """
+        上报一次导出结果：限流或失败时降速并清空令牌桶，成功时逐步恢复速率
+        """
+        with self._lock:
+            if ok and not throttled:
+                self.stats["ok"] += 1
+                if self.rate < self.max_rate:
+                    self.rate = min(self.max_rate, self.rate + rate_limit_recover)
+                    print(f"🚦 {self.platform} 导出恢复正常，速率提高到 {self.rate:.1f} 次/分钟")
+                return
+            self.stats["throttled" if throttled else "failed"] += 1
+            self.rate = max(rate_limit_min_per_minute, self.rate * rate_limit_backoff)
+            self.tokens = 0.0
+            self._updated = time.monotonic()
+        reason = "检测到限流" if throttled else "导出失败"
+        print(f"🚦 {self.platform} {reason}，速率降低到 {self.rate:.1f} 次/分钟")
+
+    def status(self):
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate, 2),
+                "max_rate_per_minute": self.max_rate,
+                "max_sessions": self.max_sessions,
+                **{k: round(v, 1) if isinstance(v, float) else v for k, v in self.stats.items()},
+            }
+
+
+class UnlimitedLimiter:
+    """
+    不限速（http 方式没有配置 http_rate_limits 时使用），接口与 PlatformLimiter 相同
+    """
+
+    def __init__(self, platform):
+        self.platform = platform
+
+    @contextmanager
+    def session(self):
+        yield
+
+    def report(self, ok, throttled=False):
+        pass
+
+    def status(self):
+        return {"unlimited": True}
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(platform, engine=None):
+    """
+    返回平台共用的限速器：浏览器方式按 rate_limits 创建；http 方式只有配置了 http_rate_limits 时才限速
+    :param engine: "selenium" 或 "http"，None 按浏览器方式
+    """
+    http = engine == "http"
+    key = f"{platform}/http" if http else platform
+    with _limiters_lock:
+        if key not in _limiters:
+            config = (http_rate_limits or {}).get(platform) if http else rate_limits[platform]
+            if config:
+                _limiters[key] = PlatformLimiter(platform, config["exports_per_minute"], config["max_sessions"])
+            else:
+                _limiters[key] = UnlimitedLimiter(platform)
+        return _limiters[key]
+
+
+def limiter_status():
+    with _limiters_lock:
+        return {key: limiter.status() for key, limiter in _limiters.items()}
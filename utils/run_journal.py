@@ -0,0 +1,165 @@
+'''
+运行日志（断点续跑）：按 平台 + 日期 记录每个账号进行到哪一步
+（cookies_loaded → export_clicked → file_landed → merged），
+重新运行时只处理未完成的账号；单个账号失败时按指数退避重试，次数有上限
+'''
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    run_journal_path, max_account_retries, retry_backoff_base, retry_backoff_max
+)
+
+STAGES = ("pending", "cookies_loaded", "export_clicked", "file_landed", "merged")
+
+# 抖音、小红书同时运行时共用同一个文件，写入时加锁并只覆盖自己的那一段
+_file_lock = threading.Lock()
+
+
+def _load(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class RunJournal:
+    def __init__(self, platform, run_date=None, path=run_journal_path):
+        """
+        :param platform: "douyin" 或 "xhs"
+        :param run_date: 运行日期（YYYY-MM-DD），None 时为今天；同一天的多次运行共用一份记录
+        """
+        self.platform = platform
+        self.run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+        self.run_id = f"{platform}_{self.run_date}"
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            data = _load(self.path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 运行日志读取失败，将重新记录：{e}")
+            data = {}
+        self.accounts = data.get(self.run_id, {})
+
+    def _save(self):
+        with _file_lock:
+            try:
+                data = _load(self.path)
+            except (OSError, ValueError):
+                data = {}
+            data[self.run_id] = self.accounts
+            # 每个平台只保留最近 7 天的记录，避免文件无限增长
+            run_ids = sorted(
+                (k for k in data if k.startswith(f"{self.platform}_")),
+                key=lambda k: k.rsplit("_", 1)[-1]
+            )
+            for run_id in run_ids[:-7]:
+                del data[run_id]
+            os.makedirs(os.path.dirname(str(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+    def record(self, cookies_file, stage, **extra):
+        """
+        记录账号到达的步骤，extra 中的字段（如 file、error）一并保存
+        """
+        with self._lock:
+            entry = self.accounts.setdefault(cookies_file, {"stage": "pending", "attempts": 0})
+            entry["stage"] = stage
+            entry["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            entry.update(extra)
+            self._save()
+
+    def reset(self):
+        """
+        清空本次运行（当天）的记录，所有账号重新导出
+        """
+        with self._lock:
+            self.accounts.clear()
+            self._save()
+
+    def start_attempt(self, cookies_file):
+        with self._lock:
+            entry = self.accounts.setdefault(cookies_file, {"stage": "pending", "attempts": 0})
+            entry["attempts"] += 1
+            entry["stage"] = "pending"
+            self._save()
+            return entry["attempts"]
+
+    def stage_of(self, cookies_file):
+        return self.accounts.get(cookies_file, {}).get("stage", "pending")
+
+    def is_landed(self, cookies_file):
+        """
+        文件已落盘（或已合并）的账号不需要再导出；内存捕获的文件没有落盘，中断后需要重新导出
+        """
+        entry = self.accounts.get(cookies_file, {})
+        if entry.get("stage") == "merged":
+            return True
+        return entry.get("stage") == "file_landed" and not str(entry.get("file", "")).startswith("memory://")
+
+    def pending(self, paths):
+        return [p for p in paths if not self.is_landed(p)]
+
+    def mark_merged(self):
+        """
+        合并成功后，把所有已落盘的账号标记为 merged
+        """
+        with self._lock:
+            for entry in self.accounts.values():
+                if entry.get("stage") == "file_landed":
+                    entry["stage"] = "merged"
+            self._save()
+
+
+def run_with_retry(job, cookies_file, journal):
+    """
+    运行单个账号，直到导出文件落地或达到 max_account_retries 次；每次重试前等待时间翻倍（上限 retry_backoff_max）。
+    页面步骤确定性失败（结果中 step_failed 不为空，如找不到按钮、日期未被接受）时不再重试
+    :param job: 单次运行函数，返回包含 "file"、"step_failed" 的结果字典
+    """
+    result = None
+    for attempt in range(1, max_account_retries + 1):
+        journal.start_attempt(cookies_file)
+        try:
+            result = job(cookies_file)
+            error = None if result.get("file") else result.get("step_failed") or "未获取到导出文件"
+        except Exception as e:
+            error = str(e)
+        if error is None:
+            return result
+        journal.record(cookies_file, journal.stage_of(cookies_file), error=error)
+        if result is not None and result.get("step_failed"):
+            print(f"⛔ 页面步骤失败，重试也不会成功，不再重试：{error}")
+            break
+        if attempt < max_account_retries:
+            delay = min(retry_backoff_base * 2 ** (attempt - 1), retry_backoff_max)
+            print(f"🔁 第 {attempt} 次尝试失败（{error}），{delay}s 后重试")
+            time.sleep(delay)
+        else:
+            print(f"❌ 已尝试 {attempt} 次仍失败：{error}")
+    if result is None:
+        raise RuntimeError(f"账号连续 {max_account_retries} 次运行出错")
+    return result
+
+
+def failed_accounts(results):
+    """
+    run_all 的结果中失败的账号：运行出错，或重试后仍没有导出文件（run_all 的汇总和 main.py 的失败计数共用）
+    :return: {cookie 文件路径: 失败原因}
+    """
+    failed = {}
+    for path, r in results.items():
+        if not r["ok"]:
+            failed[path] = str(r["result"])
+        elif not r["result"]["file"]:
+            failed[path] = r["result"].get("step_failed") or "未获取到导出文件"
+    return failed
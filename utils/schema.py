@@ -0,0 +1,150 @@
+'''
+字段类型登记：由 project_config 中的 fields（统一字段及类型）和 platform_column_maps（各平台列名的对应关系）生成，
+读取导出文件、合并、每日数据计算都按这里的类型转换，不再各自推断：
+平台、账号、体裁等重复很多的文字为 category，计数为可为空的 Int32，比率、时长为 float32，日期为 datetime64。
+文字形式的数字（“1.2万”“3亿”“35%”）按单位换算，无法识别或被四舍五入的值会打印提示
+'''
+
+import pandas as pd
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import fields, platform_column_maps
+
+# 计数字段（fields 中 number 类型的其余字段是比率、时长，用 float32）
+COUNT_FIELDS = ["播放量", "点赞量", "分享量", "评论量", "收藏量", "主页访问量", "粉丝增量"]
+# 取值种类少、重复多的 text 字段，也用 category
+CATEGORY_FIELDS = ["体裁", "审核状态"]
+# 不属于统一字段、但各阶段都会出现的列
+EXTRA_COLUMNS = {"账号": "category", "来源文件": "category", "平台": "category"}
+# 平台导出中日期列的文字格式，未列出的按 pandas 自动识别
+DATE_FORMATS = {"xhs": {"首次发布时间": "%Y年%m月%d日%H时%M分%S秒"}}
+
+FIELD_TYPES = {f["label"]: f["type"] for f in fields}
+
+_INT32_MAX = 2 ** 31 - 1
+
+
+def _kind(label):
+    field_type = FIELD_TYPES[label]
+    if field_type == "combo" or label in CATEGORY_FIELDS:
+        return "category"
+    if field_type == "datetime":
+        return "datetime"
+    if field_type == "number":
+        return "count" if label in COUNT_FIELDS else "number"
+    return "text"
+
+
+def column_kinds(platform=None):
+    """
+    :param platform: "douyin"、"xhs"，None 时为统一字段名（视频质量数据模板）
+    :return: {列名: "category" / "count" / "number" / "datetime" / "text"}
+    """
+    mapping = platform_column_maps[platform] if platform else {label: label for label in FIELD_TYPES}
+    kinds = dict(EXTRA_COLUMNS)
+    for label, column in mapping.items():
+        if column:
+            kinds[column] = _kind(label)
+    return kinds
+
+
+def unified_mapping(platform):
+    """
+    :return: {统一字段: 平台列名}，平台没有的字段为 None；所属平台、数据日期对应每日数据中的“平台”“日期”
+    """
+    mapping = {"所属平台": "平台", "数据日期": "日期"}
+    mapping.update(platform_column_maps[platform])
+    return {label: mapping.get(label) for label in FIELD_TYPES}
+
+
+COUNT_COLUMNS = {
+    platform: [column for column, kind in column_kinds(platform).items() if kind == "count"]
+    for platform in platform_column_maps
+}
+
+
+_UNITS = {"万": 1e4, "亿": 1e8}
+
+
+def _parse_numbers(series):
+    """
+    文字转数字：去掉千分位逗号，识别“1.2万”“3亿”等中文单位和“35%”；无法识别的值为空，并打印数量和示例
+    :return: float64 Series
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("float64")
+    text = series.astype(str).str.strip().str.replace(",", "", regex=False)
+    parts = text.str.extract(r"^([-+]?\d*\.?\d+)\s*(万|亿|%)?$")
+    values = pd.to_numeric(parts[0], errors="coerce")
+    scale = parts[1].map({**_UNITS, "%": 0.01}).fillna(1.0)
+    values = (values * scale).where(series.notna())
+    # 原本就是数字的值（object 列中的 int/float）直接使用
+    numeric = pd.to_numeric(series, errors="coerce")
+    values = numeric.where(numeric.notna(), values)
+    coerced = series.notna() & values.isna() & (text != "") & (text != "-")
+    if coerced.any():
+        examples = ", ".join(series[coerced].astype(str).unique()[:3])
+        print(f"⚠️ “{series.name}”有 {int(coerced.sum())} 个值无法识别为数字，已按空值处理：{examples}")
+    return values.astype("float64")
+
+
+def _to_count(series):
+    if isinstance(series.dtype, (pd.Int32Dtype, pd.Int64Dtype)):
+        return series
+    values = _parse_numbers(series)
+    fractional = values.notna() & (values != values.round())
+    if fractional.any():
+        print(f"⚠️ “{series.name}”有 {int(fractional.sum())} 个计数不是整数，已四舍五入")
+    values = values.round()
+    if values.abs().max() > _INT32_MAX:
+        return values.astype("Int64")
+    return values.astype("Int32")
+
+
+def _to_number(series):
+    if pd.api.types.is_float_dtype(series) and series.dtype.itemsize == 4:
+        return series
+    # “35%”按 0.35、“1.2万”按 12000 转换，比率、时长列统一为 float32
+    return _parse_numbers(series).astype("float32")
+
+
+def _to_datetime(series, fmt=None):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not fmt:
+        return pd.to_datetime(series, errors="coerce")
+    parsed = pd.to_datetime(series.astype(str), format=fmt, errors="coerce")
+    # 不是平台导出格式的值（如另存 Excel 中的“2025-05-01”）按 pandas 自动识别
+    other = parsed.isna() & series.notna()
+    if other.any():
+        parsed[other] = pd.to_datetime(series[other], errors="coerce")
+    return parsed
+
+
+def _to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    # 统一为文字，避免数字和文字混在同一个 category 中
+    return series.where(series.isna(), series.astype(str)).astype("category")
+
+
+def apply_schema(df, platform=None):
+    """
+    按登记的类型转换 df 中存在的列（已是目标类型的列不再转换），其余列不变
+    :param platform: "douyin"、"xhs"，None 时按统一字段名
+    :return: 转换后的 df（原地修改）
+    """
+    formats = DATE_FORMATS.get(platform, {})
+    for column, kind in column_kinds(platform).items():
+        if column not in df.columns:
+            continue
+        if kind == "category":
+            df[column] = _to_category(df[column])
+        elif kind == "count":
+            df[column] = _to_count(df[column])
+        elif kind == "number":
+            df[column] = _to_number(df[column])
+        elif kind == "datetime":
+            df[column] = _to_datetime(df[column], formats.get(column))
+    return df
@@ -0,0 +1,155 @@
+'''
+快照库：每天合并后的累计数据按 平台/日期 保存为一个分区（与合并结果相同的 Arrow 文件，未安装 pyarrow 时为 pickle），只增不删。
+任意一天的每日数据 = 当天分区 − 之前最近一个分区，重复运行只会覆盖同一天的分区，不再需要删除、改名 yesterday.xlsx
+'''
+
+import os
+import re
+import glob
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import snapshot_path
+from utils.merged_store import read_store, write_store, store_exists
+from utils.schema import apply_schema
+from utils.content_id import ID_COLUMN, content_ids
+
+_DATE_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.(arrow|pkl)$")
+# 合并时从当天快照中保留的数据在文件列表中的标识（不对应磁盘文件）
+CARRIED_KEY = "snapshot://today"
+
+
+def _date_str(date):
+    if isinstance(date, str):
+        return datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    return date.strftime("%Y-%m-%d")
+
+
+class SnapshotStore:
+    def __init__(self, root=snapshot_path):
+        self.root = str(root)
+
+    def _partition(self, platform, date):
+        return os.path.join(self.root, platform, f"{_date_str(date)}.arrow")
+
+    def dates(self, platform):
+        """
+        日期索引
+        :return: 该平台已有快照的日期（YYYY-MM-DD，升序）
+        """
+        found = set()
+        for path in glob.glob(os.path.join(self.root, platform, "*")):
+            match = _DATE_FILE.match(os.path.basename(path))
+            if match:
+                found.add(match.group(1))
+        return sorted(found)
+
+    def has(self, platform, date):
+        return store_exists(self._partition(platform, date))
+
+    def latest(self, platform, before=None):
+        """
+        :param before: 只找早于该日期的快照，None 为不限
+        :return: 最近一个快照的日期，没有时返回 None
+        """
+        dates = self.dates(platform)
+        if before is not None:
+            dates = [d for d in dates if d < _date_str(before)]
+        return dates[-1] if dates else None
+
+    def save(self, platform, date, df):
+        """
+        保存（或覆盖）某一天的快照，同一天重复运行结果相同
+        :return: 分区路径
+        """
+        return write_store(df, self._partition(platform, date))
+
+    def save_file(self, platform, date, path):
+        """
+        把已写好的合并结果文件复制为某一天的快照（流式合并的结果不必读入内存）
+        :return: 分区路径
+        """
+        path = str(path)
+        target = os.path.splitext(self._partition(platform, date))[0] + os.path.splitext(path)[1]
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.tmp"
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+        return target
+
+    def load(self, platform, date, columns=None):
+        """
+        读取某一天的快照，并按 utils.schema 登记的类型转换；内容ID按快照中保存的列重新计算，
+        不同版本保存的快照（包括没有内容ID的旧快照）得到的键一致
+        """
+        df = apply_schema(read_store(self._partition(platform, date), columns=columns), platform)
+        if columns is None:
+            df[ID_COLUMN] = content_ids(df, platform)
+        return df
+
+    def import_file(self, platform, path, date=None):
+        """
+        把旧版本留下的 yesterday.xlsx 等文件存入快照库（一次性迁移用），日期默认取文件修改日期；该日期已有快照时跳过
+        :return: 存入的日期，跳过时返回 None
+        """
+        path = str(path)
+        if not (os.path.exists(path) or store_exists(path)):
+            return None
+        if date is None:
+            stat_path = path if os.path.exists(path) else os.path.splitext(path)[0] + ".pkl"
+            date = datetime.fromtimestamp(os.path.getmtime(stat_path))
+        if self.has(platform, date):
+            return None
+        if path.endswith(".xlsx"):
+            self.save(platform, date, pd.read_excel(path))
+        else:
+            self.save(platform, date, read_store(path))
+        print(f"🗃️ 已将 {path} 存入快照库：{platform} {_date_str(date)}")
+        return _date_str(date)
+
+
+def _file_account(file):
+    # 暂存目录、队列回传目录都按 <账号>/<文件> 存放；内存捕获为 memory://<平台>/<账号>
+    file = str(file)
+    if file.startswith("memory://"):
+        return file.rsplit("/", 1)[-1]
+    return os.path.basename(os.path.dirname(file))
+
+
+def carry_over(platform, files, date=None):
+    """
+    同一天再次合并时（断点续跑、队列模式重新合并），本次只有部分账号的文件；
+    当天已有快照中其余账号的数据需要一起写入，不能用部分账号覆盖整天的快照和合并结果
+    :param files: 本次合并的文件标识
+    :param date: 快照日期，None 为今天
+    :return: 需要保留的行（DataFrame），没有时返回 None
+    """
+    date = date or datetime.now()
+    store = SnapshotStore()
+    if not files or not store.has(platform, date):
+        return None
+    existing = store.load(platform, date)
+    if "账号" not in existing.columns:
+        print(f"⚠️ {platform} {_date_str(date)} 的快照没有账号列，无法按账号保留，将被本次合并结果覆盖")
+        return None
+    accounts = {_file_account(f) for f in files}
+    kept = existing[~existing["账号"].astype(str).isin(accounts)].reset_index(drop=True)
+    if kept.empty:
+        return None
+    print(f"🗃️ 保留今天快照中 {kept['账号'].nunique()} 个未重新导出账号的数据（{len(kept)} 行）")
+    return kept
+
+
+def record_snapshot(platform, store_file, date=None):
+    """
+    合并完成后把合并结果存为当天的快照
+    :param date: 快照日期，None 为今天
+    """
+    date = date or datetime.now()
+    target = SnapshotStore().save_file(platform, date, store_file)
+    print(f"🗃️ 已保存 {platform} {_date_str(date)} 的快照：{target}")
+    return target
@@ -0,0 +1,144 @@
+'''
+流式合并：逐个账号解析导出文件，转换成统一的列和类型后立即追加到合并结果（Arrow IPC 文件）并释放，
+内存峰值只与单个账号的数据量有关，与账号数量无关。需要 pyarrow；各列的 Arrow 类型由 utils.schema 的类型登记生成
+（计数 int32、比率 float32、category 为字典编码、日期 timestamp），read_store 读取的类型与 write_store 的结果相同
+'''
+
+import os
+
+import pandas as pd
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import export_columns, content_id_columns
+from utils.merged_store import ARROW
+from utils.schema import column_kinds, apply_schema
+from utils.content_id import ID_COLUMN, ensure_content_ids
+from utils.xlsx_reader import read_export_file
+
+
+def _read_chunk(file, platform):
+    # 队列模式中内存捕获的结果回传为 pickle
+    if str(file).endswith(".pkl"):
+        return pd.read_pickle(file)
+    return read_export_file(file, platform)
+
+
+def _conform(df, columns, platform, prepare, categories):
+    """
+    统一为合并结果的列和类型：缺少的列补空值，按 utils.schema 转换类型，未登记的文字列统一为 str。
+    IPC 文件中每个字典列只能追加取值，category 的取值按出现顺序累积在 categories 中，之前的编码保持不变
+    """
+    # 队列模式回传的旧 pickle 可能没有内容ID
+    df = apply_schema(ensure_content_ids(df, platform).reindex(columns=columns), platform)
+    if prepare is not None:
+        df = prepare(df)
+    kinds = column_kinds(platform)
+    for col in df.columns:
+        kind = kinds.get(col, "text")
+        if col == ID_COLUMN:
+            continue
+        if kind == "category":
+            seen = categories.setdefault(col, [])
+            known = set(seen)
+            seen.extend(v for v in df[col].cat.categories if v not in known)
+            df[col] = df[col].cat.set_categories(seen)
+        elif kind == "text":
+            values = df[col].astype(object)
+            df[col] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+_ARROW_KINDS = {
+    "count": ("int32", "Int32"),
+    "number": ("float32", "float32"),
+    "datetime": ("timestamp", "datetime64[ns]"),
+    "category": ("dictionary", "category"),
+    "text": ("string", "object"),
+}
+
+
+def _schema(columns, platform):
+    """
+    按类型登记生成 Arrow schema，并附上 pandas 元数据，读取时计数列恢复为 Int32（而不是 float64）
+    """
+    import pyarrow as pa
+    arrow_types = {
+        "int32": pa.int32(), "float32": pa.float32(), "timestamp": pa.timestamp("ns"),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()), "string": pa.string(),
+    }
+    kinds = column_kinds(platform)
+    fields, template = [], {}
+    for col in columns:
+        if col == ID_COLUMN:
+            fields.append(pa.field(col, pa.int64()))
+            template[col] = pd.Series([], dtype="int64")
+            continue
+        arrow_type, pandas_dtype = _ARROW_KINDS[kinds.get(col, "text")]
+        fields.append(pa.field(col, arrow_types[arrow_type]))
+        template[col] = pd.Series([], dtype=pandas_dtype)
+    metadata = pa.Schema.from_pandas(pd.DataFrame(template), preserve_index=False).metadata
+    return pa.schema(fields, metadata=metadata)
+
+
+def stream_merge(files, platform, output, parsed=None, prepare=None):
+    """
+    逐个读取并追加到 output，每个文件读取、写入后即释放
+    :param files: 按合并顺序排列的文件标识（磁盘路径，或 parsed 中内存捕获的 memory:// 键）
+    :param parsed: 已提前解析好的 {文件标识: DataFrame}，写入后从字典中移除
+    :param prepare: 每块数据写入前的平台专用转换（如发布时间转日期），接收并返回 DataFrame
+    :return: {"path": 合并结果路径（没有数据时为 None）, "rows": 行数, "merged": 成功合并的文件, "errors": {文件: 异常}}
+    """
+    import pyarrow as pa
+    from pyarrow import ipc
+
+    parsed = parsed if parsed is not None else {}
+    columns = None
+    if export_columns.get(platform):
+        columns = ["账号"] + export_columns[platform] + content_id_columns.get(platform, []) + ["来源文件", ID_COLUMN]
+    output = str(output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp = f"{output}.tmp"
+    writer, sink, schema = None, None, None
+    rows, merged, errors, categories = 0, [], {}, {}
+    try:
+        for file in files:
+            try:
+                chunk = parsed.pop(file) if file in parsed else _read_chunk(file, platform)
+            except Exception as e:
+                errors[file] = e
+                continue
+            if columns is None:
+                # 未配置 export_columns 时以第一个文件的列为准，之后文件多出的列忽略
+                columns = list(chunk.columns)
+            extra = [c for c in chunk.columns if c not in columns]
+            if extra:
+                print(f"⚠️ {file} 中的列不在合并结果中，已忽略：{', '.join(map(str, extra))}")
+            chunk = _conform(chunk, columns, platform, prepare, categories)
+            if writer is None:
+                schema = _schema(list(chunk.columns), platform)
+                sink = pa.OSFile(tmp, "wb")
+                # 字典列只追加新的取值（delta），IPC 文件格式不允许替换字典
+                writer = ipc.new_file(sink, schema, options=ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+            merged.append(file)
+            del chunk
+    except Exception:
+        if writer is not None:
+            writer.close()
+            sink.close()
+            os.remove(tmp)
+        raise
+    if writer is None:
+        return {"path": None, "rows": 0, "merged": merged, "errors": errors}
+    writer.close()
+    sink.close()
+    os.replace(tmp, output)
+    return {"path": output, "rows": rows, "merged": merged, "errors": errors}
+
+
+def streaming_available():
+    if not ARROW:
+        print("⚠️ 未安装 pyarrow，无法流式合并，改为一次性合并")
+    return ARROW
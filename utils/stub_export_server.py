@@ -0,0 +1,123 @@
+'''
+本地导出接口桩服务：模拟创作者中心的“导出数据”接口，用于在不访问真实平台的情况下调试 http 导出方式
+
+用法：python -m utils.stub_export_server --port 8765
+然后把 project_config 中 http_export_api 的 url 改为 http://127.0.0.1:8765/douyin 或 /xhs，
+preflight_api 改为 http://127.0.0.1:8765/douyin/user/info 或 /xhs/user/info；
+url 以 /text、/octet-json、/empty、/throttled 结尾时模拟接口返回错误页、JSON、空内容和限流。
+python -m utils.check_http_export 用它对 http 导出方式做端到端检查
+'''
+
+import io
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# 请求中必须带上的登录 cookie（任意值即可），缺失时按登录失效返回 JSON
+AUTH_COOKIES = {
+    "douyin": "sessionid",
+    "xhs": "web_session",
+}
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def build_stub_xlsx(platform, rows=20):
+    """
+    生成与平台导出文件列结构一致的示例 xlsx 字节
+    """
+    buffer = io.BytesIO()
+    if platform == "xhs":
+        df = pd.DataFrame({
+            "笔记标题": [f"笔记{i}" for i in range(rows)],
+            "首次发布时间": ["2025年05月01日10时00分00秒"] * rows,
+            "体裁": ["图文"] * rows,
+            "观看量": range(rows),
+            "点赞": range(rows),
+            "收藏": range(rows),
+            "评论": range(rows),
+            "分享": range(rows),
+            "人均观看时长": [10.0] * rows,
+            "涨粉": [0] * rows,
+        })
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            # 小红书导出文件第一行是标题说明，读取时 skiprows=1
+            pd.DataFrame([["笔记列表明细表"]]).to_excel(writer, index=False, header=False)
+            df.to_excel(writer, index=False, startrow=1)
+    else:
+        df = pd.DataFrame({
+            "作品名称": [f"作品{i}" for i in range(rows)],
+            "发布时间": ["2025-05-01 10:00:00"] * rows,
+            "体裁": ["视频"] * rows,
+            "播放量": range(rows),
+            "点赞量": range(rows),
+            "分享量": range(rows),
+            "评论量": range(rows),
+            "收藏量": range(rows),
+        })
+        df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+# 模拟接口异常的路径后缀（如 /douyin/empty）：{后缀: (状态码, Content-Type, 响应内容)}
+FAILURE_MODES = {
+    "text": (200, "text/plain; charset=utf-8", "系统繁忙，请稍后再试".encode("utf-8")),
+    "octet-json": (200, "application/octet-stream", b'{"status_code": 8, "status_msg": "user not login"}'),
+    "empty": (200, "application/octet-stream", b""),
+    "throttled": (429, "application/json", b'{"status_code": 429, "status_msg": "too many requests"}'),
+}
+
+
+class StubExportHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].strip("/")
+        platform = "xhs" if path.startswith("xhs") else "douyin"
+        cookie_header = self.headers.get("Cookie", "")
+        logged_in = f"{AUTH_COOKIES[platform]}=" in cookie_header
+        mode = path.rsplit("/", 1)[-1]
+        if logged_in and mode in FAILURE_MODES:
+            status, content_type, body = FAILURE_MODES[mode]
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+        elif not logged_in or path.endswith("user/info"):
+            # 登录状态检查接口，或未登录时的导出接口
+            body = b'{"status_code": 0}' if logged_in else b'{"status_code": 8, "status_msg": "user not login"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+        else:
+            body = build_stub_xlsx(platform)
+            self.send_response(200)
+            self.send_header("Content-Type", XLSX_CONTENT_TYPE)
+            self.send_header("Content-Disposition", f'attachment; filename="{platform}_export.xlsx"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0):
+    """
+    在后台线程中启动桩服务
+    :return: (server, base_url)，用完后调用 server.shutdown()
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubExportHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地导出接口桩服务")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubExportHandler)
+    print(f"🧪 桩服务已启动：http://127.0.0.1:{args.port}/douyin  /xhs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 桩服务已停止")
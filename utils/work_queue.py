@@ -0,0 +1,239 @@
+'''
+账号任务队列：每个账号的导出是一条任务，worker 租用（lease）任务后定期发送心跳，
+worker 崩溃或断网时租约到期，任务自动回到队列由其他 worker 接手。
+SqliteWorkQueue 用 SQLite 文件（自带文件锁）实现，适合单机多进程或本地测试；
+多台机器共用时把 work_queue_path 放到共享盘，或按同样的方法实现其他后端
+'''
+
+import os
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    work_queue_path, queue_lease_seconds, queue_heartbeat_interval, queue_max_attempts,
+    retry_backoff_base, retry_backoff_max
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    platform TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    cookie_name TEXT NOT NULL,
+    window_start TEXT,
+    window_end TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_path TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs (platform, run_date, status);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SqliteWorkQueue:
+    def __init__(self, path=work_queue_path, lease_seconds=queue_lease_seconds, max_attempts=queue_max_attempts):
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # 每次操作单独连接，多个线程、进程可以同时使用同一个队列文件
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            # IMMEDIATE：开始事务时即加写锁，避免两个 worker 租到同一条任务
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def enqueue(self, platform, run_date, cookie_name, window=None):
+        """
+        加入一条任务；同一平台、同一天、同一账号的任务只会存在一条
+        :return: 是否新加入
+        """
+        window_start, window_end = window or (None, None)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, platform, run_date, cookie_name, window_start, window_end, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (f"{platform}|{run_date}|{cookie_name}", platform, run_date, cookie_name,
+                 window_start, window_end, time.time())
+            )
+            return cursor.rowcount == 1
+
+    def lease(self, worker, platforms=None):
+        """
+        租用一条可运行的任务：等待中的任务，或租约已过期的任务；
+        租约过期且已运行 max_attempts 次的任务（worker 反复崩溃）标记为 failed，不再分配
+        :param platforms: 只租用这些平台的任务，None 为不限
+        :return: 任务字典，没有可运行的任务时返回 None
+        """
+        now = time.time()
+        where, args = "", []
+        if platforms:
+            where = f" AND platform IN ({','.join('?' * len(platforms))})"
+            args = list(platforms)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_until = NULL, updated_at = ?"
+                " WHERE status = 'leased' AND lease_until < ? AND attempts >= ?" + where,
+                [f"租约过期，已运行 {self.max_attempts} 次", now, now, self.max_attempts] + args
+            )
+            if cursor.rowcount:
+                print(f"⛔ {cursor.rowcount} 个任务的租约过期且已达到 {self.max_attempts} 次，标记为失败")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE ((status = 'pending' AND available_at <= ?)"
+                " OR (status = 'leased' AND lease_until < ?))" + where + " ORDER BY available_at, job_id LIMIT 1",
+                [now, now] + args
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "leased":
+                print(f"⌛ 任务 {row['job_id']} 的租约已过期（{row['worker']}），重新分配")
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE job_id = ?",
+                (worker, now + self.lease_seconds, now, row["job_id"])
+            )
+            job = dict(row)
+            job.update(status="leased", worker=worker, attempts=row["attempts"] + 1)
+            return job
+
+    def heartbeat(self, job_id, worker):
+        """
+        续租
+        :return: False 表示租约已被其他 worker 接手，当前 worker 应放弃该任务
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                (now + self.lease_seconds, now, job_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result_path):
+        """
+        :return: False 表示租约已丢失（任务已交给其他 worker 或已结束），本次结果不会被采用
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result_path = ?, error = NULL, updated_at = ?"
+                " WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                (result_path, time.time(), job_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error, final=False):
+        """
+        任务失败：未达到 max_attempts 时按指数退避后重新排队，否则标记为 failed
+        :param final: True 时直接标记为 failed（重试也不会成功的失败）
+        :return: False 表示租约已丢失，没有修改任务
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND worker = ? AND status = 'leased'", (job_id, worker)
+            ).fetchone()
+            if row is None:
+                return False
+            if final or row["attempts"] >= self.max_attempts:
+                status, available_at = "failed", now
+            else:
+                status = "pending"
+                available_at = now + min(retry_backoff_base * 2 ** (row["attempts"] - 1), retry_backoff_max)
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, error = ?, lease_until = NULL, updated_at = ?"
+                " WHERE job_id = ?",
+                (status, available_at, str(error), now, job_id)
+            )
+            return True
+
+    def jobs(self, platform, run_date):
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE platform = ? AND run_date = ? ORDER BY job_id", (platform, run_date)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+    def counts(self, platform, run_date):
+        """
+        :return: {"pending": n, "leased": n, "done": n, "failed": n}
+        """
+        result = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for job in self.jobs(platform, run_date):
+            result[job["status"]] += 1
+        return result
+
+    def reset(self, platform, run_date):
+        """
+        删除该平台当天的全部任务，重新导出
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE platform = ? AND run_date = ?", (platform, run_date))
+
+
+class Heartbeat:
+    """
+    任务运行期间在后台线程中定期续租；租约丢失时 lost 置为 True
+    """
+
+    def __init__(self, queue, job_id, worker, interval=queue_heartbeat_interval):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker):
+                    self.lost = True
+                    print(f"⚠️ 任务 {self.job_id} 的租约已被其他 worker 接手")
+                    return
+            except sqlite3.Error as e:
+                print(f"⚠️ 心跳发送失败：{e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,209 @@
+'''
+浏览器 worker 池：多个账号从队列中取任务并行运行，每个账号的输出写入单独的日志文件
+'''
+
+import os
+import sys
+import time
+import queue
+import ctypes
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import (
+    max_browser_workers, browser_memory_mb, http_max_workers, browser_mode, lean_browser_memory_mb,
+    max_total_browsers
+)
+
+# 进程内所有 worker 池共用的浏览器名额和输出转发器
+_browser_slots = None
+_router = None
+_router_users = 0
+_global_lock = threading.Lock()
+
+
+def get_available_memory_mb():
+    """
+    获取当前可用物理内存（MB），无法获取时返回 None
+    """
+    try:
+        if os.name == "nt":
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            stat = MEMORYSTATUSEX()
+            stat.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat))
+            return int(stat.ullAvailPhys // (1024 * 1024))
+        pages = os.sysconf("SC_AVPHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        return int(pages * page_size // (1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def resolve_worker_count(requested=None, jobs=None, browser=True):
+    """
+    计算实际使用的 worker 数量：取 配置/传入值、可用内存允许的浏览器数、任务数 三者最小值
+    :param requested: 期望的 worker 数，None 时使用 project_config 中的 max_browser_workers（http 方式为 http_max_workers）
+    :param jobs: 任务数量，worker 数不会超过任务数
+    :param browser: 每个 worker 是否启动浏览器，False 时不按内存限制
+    """
+    if requested is None:
+        requested = max_browser_workers if browser else http_max_workers
+    workers = requested
+    per_browser_mb = lean_browser_memory_mb if browser_mode == "lean" else browser_memory_mb
+    available_mb = get_available_memory_mb() if browser else None
+    if available_mb is not None and per_browser_mb > 0:
+        memory_cap = max(1, available_mb // per_browser_mb)
+        if memory_cap < workers:
+            print(f"⚠️ 可用内存 {available_mb}MB，仅允许 {memory_cap} 个浏览器并行")
+            workers = memory_cap
+    if jobs is not None:
+        workers = min(workers, jobs)
+    return max(1, int(workers))
+
+
+@contextmanager
+def browser_slot():
+    """
+    占用一个全局浏览器名额：多个平台同时运行时，浏览器总数不超过 max_total_browsers（同样受可用内存限制）
+    """
+    global _browser_slots
+    with _global_lock:
+        if _browser_slots is None:
+            _browser_slots = threading.BoundedSemaphore(resolve_worker_count(max_total_browsers))
+    _browser_slots.acquire()
+    try:
+        yield
+    finally:
+        _browser_slots.release()
+
+
+class _ThreadLocalStdout:
+    """
+    按线程转发 print 输出：绑定了日志文件的 worker 线程写入自己的文件，其余线程写控制台
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self._local = threading.local()
+
+    def bind(self, stream):
+        self._local.stream = stream
+
+    def unbind(self):
+        self._local.stream = None
+
+    def _target(self):
+        return getattr(self._local, "stream", None) or self.console
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+
+def _acquire_router():
+    """
+    多个 worker 池同时运行时共用同一个转发器，最后一个池结束时才恢复 sys.stdout
+    """
+    global _router, _router_users
+    with _global_lock:
+        if _router is None:
+            _router = _ThreadLocalStdout(sys.stdout)
+            sys.stdout = _router
+        _router_users += 1
+        return _router
+
+
+def _release_router():
+    global _router, _router_users
+    with _global_lock:
+        _router_users -= 1
+        if _router_users == 0:
+            sys.stdout = _router.console
+            _router = None
+
+
+def run_in_pool(items, job, workers=1, log_dir=None, name_of=str):
+    """
+    启动 workers 个线程，从队列中依次取出 items 执行 job(item)
+    :param items: 任务列表（如 cookie 文件路径）
+    :param job: 单个任务的执行函数
+    :param workers: 并发 worker 数
+    :param log_dir: 日志目录，不为 None 时每个任务的输出写入 log_dir/<名称>.log
+    :param name_of: 由任务生成名称（用于日志文件名和汇总输出）
+    :return: {item: {"ok": bool, "result": 返回值或异常, "seconds": 用时}}
+    """
+    tasks = queue.Queue()
+    for item in items:
+        tasks.put(item)
+
+    results = {}
+    lock = threading.Lock()
+    router = None
+    if log_dir is not None:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        router = _acquire_router()
+    console = router.console if router else sys.stdout
+
+    def worker(index):
+        while True:
+            try:
+                item = tasks.get_nowait()
+            except queue.Empty:
+                return
+            name = name_of(item)
+            log_file = None
+            if router:
+                log_file = open(Path(log_dir) / f"{name}.log", "a", encoding="utf-8")
+                router.bind(log_file)
+            start = time.perf_counter()
+            try:
+                result, ok = job(item), True
+            except Exception as e:
+                result, ok = e, False
+                print(f"❌ 账号处理失败：{name}，错误：{e}")
+            finally:
+                if router:
+                    router.unbind()
+                    log_file.close()
+            elapsed = time.perf_counter() - start
+            with lock:
+                results[item] = {"ok": ok, "result": result, "seconds": elapsed}
+                if router:
+                    status = "✅" if ok else "❌"
+                    console.write(f"{status} [worker-{index}] {name} 用时 {elapsed:.1f}s\n")
+                    console.flush()
+
+    threads = [
+        threading.Thread(target=worker, args=(i,), name=f"worker-{i}", daemon=True)
+        for i in range(max(1, workers))
+    ]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        if router:
+            _release_router()
+    return results
@@ -0,0 +1,238 @@
+'''
+导出文件读取：只读取需要的列并固定数值列类型；多个文件时用进程池并行解析。
+解析引擎按顺序选择：安装了 python-calamine 时用 calamine；否则用本模块的流式 XML 解析（只依赖标准库，
+比 openpyxl 快约 2 倍）；遇到不支持的文件（如日期格式的单元格）时回退到 openpyxl。
+解析结果按文件内容缓存（utils.parse_cache），重跑时内容未变的文件不再解析
+'''
+
+import io
+import os
+import importlib.util
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from utils.init_path import setup_project_root
+setup_project_root()
+from project_config.project import export_columns, content_id_columns, xlsx_read_workers
+from utils.parse_cache import default_cache
+from utils.schema import apply_schema, column_kinds
+from utils.content_id import ID_COLUMN, content_ids
+
+# 各平台导出文件的格式：小红书第一行是标题说明，需要跳过
+EXPORT_SKIPROWS = {"douyin": 0, "xhs": 1}
+
+
+# 文件数不超过该值时直接在当前进程读取，省去进程池的启动开销
+PARALLEL_MIN_FILES = 3
+
+
+ENGINE = "calamine" if importlib.util.find_spec("python_calamine") is not None else "stream"
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Excel 内置的日期/时间数字格式编号
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+
+
+class UnsupportedWorkbook(Exception):
+    """流式解析不支持的文件，改用 openpyxl 读取"""
+
+
+def _column_index(ref):
+    index = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + ord(ch.upper()) - 64
+    return index - 1
+
+
+def _first_sheet_path(z):
+    workbook = ET.fromstring(z.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{_NS}sheets/{_NS}sheet")
+    rel_id = sheet.get(f"{_REL_NS}id")
+    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{_PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise UnsupportedWorkbook("找不到第一个工作表")
+
+
+def _date_styles(z):
+    """
+    :return: 使用日期/时间格式的单元格样式编号集合
+    """
+    if "xl/styles.xml" not in z.namelist():
+        return set()
+    styles = ET.fromstring(z.read("xl/styles.xml"))
+    custom_dates = set()
+    for fmt in styles.iter(f"{_NS}numFmt"):
+        # 去掉引号内的文字和 [颜色] 等方括号内容后，含有日期时间占位符即视为日期格式
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]', "", fmt.get("formatCode", "")).lower()
+        if re.search(r"[dmyhs]", code):
+            custom_dates.add(int(fmt.get("numFmtId")))
+    cell_xfs = styles.find(f"{_NS}cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {
+        i for i, xf in enumerate(cell_xfs.findall(f"{_NS}xf"))
+        if int(xf.get("numFmtId", 0)) in _BUILTIN_DATE_FORMATS | custom_dates
+    }
+
+
+def _sheet_rows(file):
+    """
+    用 iterparse 逐行解析第一个工作表，单元格取值规则与 pandas 的 openpyxl 读取方式一致
+    :return: 行列表（与 pandas 内部 get_sheet_data 的结果相同）
+    """
+    with zipfile.ZipFile(file) as z:
+        strings = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            with z.open("xl/sharedStrings.xml") as f:
+                for _, el in ET.iterparse(f):
+                    if el.tag == f"{_NS}si":
+                        strings.append("".join(t.text or "" for t in el.iter(f"{_NS}t")))
+                        el.clear()
+        date_styles = _date_styles(z)
+
+        data = []
+        with z.open(_first_sheet_path(z)) as f:
+            for _, el in ET.iterparse(f):
+                if el.tag != f"{_NS}row":
+                    continue
+                row_number = int(el.get("r", len(data) + 1))
+                while len(data) < row_number - 1:
+                    data.append([])
+                row = []
+                for cell in el.iter(f"{_NS}c"):
+                    cell_type = cell.get("t", "n")
+                    if cell_type == "inlineStr":
+                        node = cell.find(f"{_NS}is")
+                        value = "".join(t.text or "" for t in node.iter(f"{_NS}t")) if node is not None else ""
+                    else:
+                        node = cell.find(f"{_NS}v")
+                        if node is None or node.text is None:
+                            value = ""
+                        elif cell_type == "s":
+                            value = strings[int(node.text)]
+                        elif cell_type == "b":
+                            value = node.text == "1"
+                        elif cell_type == "e":
+                            value = np.nan
+                        elif cell_type in ("str", "d"):
+                            value = node.text
+                        else:
+                            if int(cell.get("s", 0)) in date_styles:
+                                raise UnsupportedWorkbook("包含日期格式的单元格")
+                            number = float(node.text)
+                            value = int(number) if number.is_integer() else number
+                    index = _column_index(cell.get("r")) if cell.get("r") else len(row)
+                    row.extend([""] * (index - len(row)))
+                    row.append(value)
+                while row and row[-1] == "":
+                    row.pop()
+                data.append(row)
+                el.clear()
+
+    while data and not data[-1]:
+        data.pop()
+    if data:
+        width = max(len(row) for row in data)
+        data = [row + [""] * (width - len(row)) for row in data]
+    return data
+
+
+def read_xlsx_stream(file, skiprows=0, usecols=None):
+    data = _sheet_rows(file)
+    if len(data) <= skiprows:
+        return pd.DataFrame()
+    return TextParser(data, header=0, skiprows=skiprows, usecols=usecols, skip_blank_lines=False).read()
+
+
+def read_xlsx(file, skiprows=0, columns=None, engine=None):
+    """
+    读取单个 xlsx
+    :param columns: 需要的列名列表，文件中不存在的列忽略；None 时读取全部列
+    :param engine: "calamine"、"stream" 或 "openpyxl"，None 时自动选择；失败时回退到 openpyxl
+    """
+    engine = engine or ENGINE
+    usecols = (lambda c: c in columns) if columns else None
+    try:
+        if engine == "stream":
+            return read_xlsx_stream(file, skiprows=skiprows, usecols=usecols)
+        return pd.read_excel(file, skiprows=skiprows, usecols=usecols, engine=engine)
+    except Exception:
+        if engine == "openpyxl":
+            raise
+        if isinstance(file, io.BytesIO):
+            file.seek(0)
+        return pd.read_excel(file, skiprows=skiprows, usecols=usecols, engine="openpyxl")
+
+
+def _parse_export(file, platform, columns):
+    # 读取时即按 utils.schema 登记的类型转换（计数 Int32、日期 datetime64、体裁等为 category）
+    return apply_schema(read_xlsx(file, skiprows=EXPORT_SKIPROWS[platform], columns=columns), platform)
+
+
+def read_export_file(file, platform, account=None, use_cache=True):
+    """
+    读取单个账号的导出文件，加上“账号”“来源文件”“内容ID”列；内容未变的文件直接使用解析缓存
+    :param file: 文件路径，或内存捕获得到的 BytesIO
+    :param account: 账号名，None 时取文件所在的暂存目录名
+    :param use_cache: False 时总是重新解析（性能测试用）
+    """
+    columns = export_columns.get(platform)
+    if columns:
+        columns = columns + content_id_columns.get(platform, [])
+    tag = f"export|{platform}|{EXPORT_SKIPROWS[platform]}|{columns}|{column_kinds(platform)}"
+    parse = lambda f: _parse_export(f, platform, columns)
+    df = default_cache().get_or_parse(file, tag, parse) if use_cache else parse(file)
+    if isinstance(file, io.BytesIO):
+        source = "内存捕获"
+    else:
+        source = os.path.basename(file)
+        account = account or os.path.basename(os.path.dirname(file))
+    df.insert(0, "账号", pd.Categorical([account] * len(df)))
+    df["来源文件"] = pd.Categorical([source] * len(df))
+    df[ID_COLUMN] = content_ids(df, platform)
+    return df
+
+
+def _read_one(args):
+    file, platform, use_cache = args
+    try:
+        return file, read_export_file(file, platform, use_cache=use_cache), None
+    except Exception as e:
+        return file, None, e
+
+
+def read_export_files(files, platform, workers=None, use_cache=True):
+    """
+    并行读取多个导出文件
+    :param workers: 进程数，None 时使用 project_config 中的 xlsx_read_workers（再为 None 时为 CPU 核数）
+    :return: ({文件路径: DataFrame}, {文件路径: 异常})
+    """
+    workers = workers or xlsx_read_workers or os.cpu_count() or 1
+    jobs = [(f, platform, use_cache) for f in files]
+    if len(jobs) < PARALLEL_MIN_FILES or workers <= 1:
+        results = [_read_one(job) for job in jobs]
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                results = list(pool.map(_read_one, jobs))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️ 进程池不可用，改为逐个读取：{e}")
+            results = [_read_one(job) for job in jobs]
+    frames = {f: df for f, df, err in results if err is None}
+    errors = {f: err for f, df, err in results if err is not None}
+    return frames, errors